@@ -1,24 +1,200 @@
+import json
 import logging
+import math
+import os
+import resource
+import threading
+import tracemalloc
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from itertools import count
 from time import perf_counter
 
 # Constants
 LOG_MESSAGE = "Execution finished. Elapsed time: {:.6f} seconds."
+PERCENTILES = (50, 95, 99)
+MAX_SAMPLES = 100000
+TOP_ALLOCATIONS = 10
+# Keep the profiler's own allocations out of the report
+MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class Tracer:
+    """
+    Collects finished spans and keeps per-name latency histograms.
+    Spans are recorded from any thread as to_dict() snapshots, export_json and export_chrome_trace dump them.
+    Only the last max_samples spans, and durations per name, are kept.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self.spans = deque(maxlen=max_samples)
+        self.durations = defaultdict(lambda: deque(maxlen=max_samples))
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def record(self, span: "TimerContext"):
+        # A snapshot, the same context may be entered again and overwrite its ids and times
+        record = span.to_dict()
+        with self._lock:
+            self.spans.append(record)
+            self.durations[record["name"]].append(record["elapsed"])
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.durations.clear()
+
+    def histogram(self, name: str) -> dict:
+        """count, min, max and nearest-rank p50/p95/p99 of a span name, in seconds"""
+        durations = sorted(self.durations.get(name, ()))
+        if not durations:
+            return {"count": 0}
+        histogram = {"count": len(durations), "min": durations[0], "max": durations[-1]}
+        for percentile in PERCENTILES:
+            histogram[f"p{percentile}"] = durations[max(0, math.ceil(len(durations) * percentile / 100) - 1)]
+        return histogram
+
+    def histograms(self) -> dict:
+        return {name: self.histogram(name) for name in list(self.durations)}
+
+    def export_json(self, path: str):
+        with open(path, "w") as file:
+            json.dump({
+                "spans": list(self.spans),
+                "histograms": self.histograms(),
+            }, file, indent=2)
+
+    def export_chrome_trace(self, path: str):
+        """Write complete ("X") events, open the file in chrome://tracing or Perfetto"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span["name"],
+                "ph": "X",
+                "ts": span["start"] * 1e6,
+                "dur": span["elapsed"] * 1e6,
+                "pid": pid,
+                "tid": span["thread_id"],
+                "args": {"id": span["id"], "parent_id": span["parent_id"]},
+            }
+            for span in list(self.spans)
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+TRACER = Tracer()
+_current_span = ContextVar("current_span", default=None)
 
 
 class TimerContext:
     """
     Measures the execution time of code inside the context manager block.
     Logs elapsed time with INFO level by default.
+    Nested blocks become child spans of the enclosing one, every finished span
+    is recorded in the tracer. Set TimerContext.enabled = False to turn it off.
+    profile_memory=True also reports net allocated bytes, the top allocation
+    sites and peak RSS of the block (see memory_report).
     """
 
+    enabled = True
+
+    def __init__(self, name: str = "timer", log_level: int | None = logging.INFO, tracer: Tracer = TRACER,
+                 profile_memory: bool = False, top: int = TOP_ALLOCATIONS):
+        """log_level=None records the span without logging it"""
+        self.name = name
+        self.log_level = log_level
+        self.tracer = tracer
+        self.profile_memory = profile_memory
+        self.top = top
+        self.memory_report = None
+        self._token = None
+        self._parent = None
+
     def __enter__(self):
+        if not TimerContext.enabled:
+            return self
+        parent = _current_span.get()
+        self._parent = parent
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = self.tracer.next_id()
+        self.thread_id = threading.get_ident()
+        self._token = _current_span.set(self)
+        if self.log_level is not None:
+            logging.log(self.log_level, "Timer started.")
+        if self.profile_memory:
+            self._start_memory_profile()
         self.start_time = perf_counter()
-        logging.info("Timer started.")
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        if self._token is None:
+            return
         self.end_time = perf_counter()
-        self._log_elapsed_time()
+        if self.profile_memory:
+            self._finish_memory_profile()
+        _current_span.reset(self._token)
+        self._token = None
+        self._parent = None
+        self.tracer.record(self)
+        if self.log_level is not None:
+            self._log_elapsed_time(self.log_level)
+            if self.memory_report is not None:
+                self._log_memory_report(self.log_level)
+
+    def _start_memory_profile(self):
+        # Snapshots are taken outside of the timed part
+        self._stop_tracing = not tracemalloc.is_tracing()
+        if self._stop_tracing:
+            tracemalloc.start()
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(MEMORY_FILTERS)
+        # reset_peak() is process-wide, hand the peak so far to the enclosing profiled spans first
+        self._nested_peak = 0
+        peak = tracemalloc.get_traced_memory()[1]
+        span = self._parent
+        while span is not None:
+            if span.profile_memory:
+                span._nested_peak = max(span._nested_peak, peak)
+            span = span._parent
+        tracemalloc.reset_peak()
+        self._peak_rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def _finish_memory_profile(self):
+        traced_peak = max(tracemalloc.get_traced_memory()[1], self._nested_peak)
+        snapshot = tracemalloc.take_snapshot().filter_traces(MEMORY_FILTERS)
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if self._stop_tracing:
+            tracemalloc.stop()
+
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = None
+        self.memory_report = {
+            "net_bytes": sum(stat.size_diff for stat in stats),
+            "traced_peak_bytes": traced_peak,
+            # ru_maxrss is KiB on Linux, it only grows over the process lifetime
+            "peak_rss_kib_before": self._peak_rss_before,
+            "peak_rss_kib_after": peak_rss,
+            "top_allocations": [
+                {"site": str(stat.traceback), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                for stat in stats[:self.top]
+            ],
+        }
+
+    def _log_memory_report(self, log_level=logging.INFO):
+        report = self.memory_report
+        logging.log(log_level, f"Net allocated: {report['net_bytes'] / 1024:.1f} KiB, "
+                               f"traced peak: {report['traced_peak_bytes'] / 1024:.1f} KiB, "
+                               f"peak RSS: {report['peak_rss_kib_before']} -> {report['peak_rss_kib_after']} KiB")
+        for allocation in report["top_allocations"]:
+            logging.log(log_level, f"  {allocation['site']}: {allocation['size_diff'] / 1024:+.1f} KiB "
+                                   f"({allocation['count_diff']:+d} blocks)")
 
     def _log_elapsed_time(self, log_level=logging.INFO):
         """
@@ -27,6 +203,16 @@ class TimerContext:
         elapsed_time = self.end_time - self.start_time
         logging.log(log_level, LOG_MESSAGE.format(elapsed_time))
 
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "id": self.span_id,
+            "parent_id": self.parent_id,
+            "thread_id": self.thread_id,
+            "start": self.start_time,
+            "elapsed": self.end_time - self.start_time,
+        }
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
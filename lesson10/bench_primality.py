@@ -0,0 +1,50 @@
+import argparse
+import random
+from time import perf_counter
+from lesson10.prime_sieve import count_primes
+from lesson10.lesson10_function_optimus_prod import get_primes_amount
+
+# Constants
+MAGNITUDES = {
+    "small": (1, 10 ** 4),
+    "medium": (10 ** 6, 10 ** 7),
+    "large": (10 ** 12, 10 ** 18),
+}
+MIXES = {
+    "small": ("small",),
+    "medium": ("medium",),
+    "large": ("large",),
+    "mixed": ("small", "medium", "large"),
+}
+
+
+def gen_mix(magnitudes: tuple, size: int, rng: random.Random) -> list:
+    """size random numbers spread evenly over the given magnitudes"""
+    return [rng.randint(*MAGNITUDES[magnitudes[i % len(magnitudes)]]) for i in range(size)]
+
+
+def timed(func, numbers: list) -> tuple[int, float]:
+    start = perf_counter()
+    result = func(numbers)
+    return result, perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prime counting on lists of mixed magnitude.")
+    parser.add_argument("--size", type=int, default=30000, help="Numbers per list (default: 30000).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'mix':<8}{'primes':>8}{'count_primes, s':>18}{'get_primes_amount, s':>23}")
+    for name, magnitudes in MIXES.items():
+        numbers = gen_mix(magnitudes, args.size, rng)
+        routed, routed_time = timed(count_primes, numbers)
+        per_number, per_number_time = timed(get_primes_amount, numbers)
+        if routed != per_number:
+            raise AssertionError(f"Results differ for {name}: {routed} != {per_number}")
+        print(f"{name:<8}{routed:>8}{routed_time:>18.4f}{per_number_time:>23.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import logging
+from time import perf_counter
+from lesson10 import worker_pool
+from lesson10.lesson10_function import process_optimize
+from lesson10.lesson10_function_optimus_prod import process_optimize_optimus
+from lesson10.lesson10_function_optimus_prod_apply import process_optimize_optimus_aplly
+
+# Constants
+FUNCTIONS = (process_optimize, process_optimize_optimus, process_optimize_optimus_aplly)
+
+
+def per_call_overhead(func, numbers: list, calls: int, reuse_pool: bool) -> float:
+    """Average seconds per call of func on a small input"""
+    start = perf_counter()
+    for _ in range(calls):
+        func(numbers, reuse_pool=reuse_pool)
+    return (perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call overhead of a fresh pool vs the shared warm pool.")
+    parser.add_argument("--start-method", choices=worker_pool.START_METHODS, default=None)
+    parser.add_argument("--calls", type=int, default=20, help="Calls per function (default: 20).")
+    parser.add_argument("--size", type=int, default=1000, help="Input length per call (default: 1000).")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    worker_pool.configure(start_method=args.start_method)
+    numbers = list(range(1, args.size + 1))
+
+    # Start the shared pool outside of the measurement
+    worker_pool.get_pool()
+
+    print(f"{'function':<32}{'fresh, ms':>12}{'warm, ms':>12}{'speedup':>10}")
+    for func in FUNCTIONS:
+        fresh = per_call_overhead(func, numbers, args.calls, reuse_pool=False)
+        warm = per_call_overhead(func, numbers, args.calls, reuse_pool=True)
+        print(f"{func.__name__:<32}{fresh * 1000:>12.3f}{warm * 1000:>12.3f}{fresh / warm:>9.1f}x")
+
+    worker_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
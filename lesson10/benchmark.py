@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import resource
+from datetime import datetime, timezone
+from multiprocessing import Pool, Process, Queue, active_children, cpu_count, get_context, get_start_method, set_start_method
+from statistics import median
+from threading import Event, Thread
+from time import perf_counter, process_time
+from lesson10 import lesson10_async, lesson10_process_prod, lesson10_process_prod_optimus, lesson10_simple
+from lesson10 import lesson10_threads_prod, worker_pool
+from lesson10.lesson10_function import process_optimize
+from lesson10.lesson10_function_optimus_prod import process_optimize_optimus
+from lesson10.lesson10_function_optimus_prod_apply import process_optimize_optimus_aplly
+from lesson10.prime_sieve import count_primes
+
+# Constants
+STATS_SIZE = 1000000
+PRIMES_SIZE = 200000
+
+
+def stats_simple(numbers: list) -> tuple:
+    return lesson10_simple.t2_sum_numbers(numbers), lesson10_simple.t3_average_numbers(numbers)
+
+
+def stats_threads(numbers: list) -> tuple:
+    num_ready = Event()
+    num_ready.set()
+    sum_result, avg_result = [], []
+    threads = [
+        Thread(target=lesson10_threads_prod.t2_sum_numbers, args=(numbers, num_ready, sum_result)),
+        Thread(target=lesson10_threads_prod.t3_average_numbers, args=(numbers, num_ready, avg_result)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum_result[0], avg_result[0]
+
+
+def stats_process(numbers: list) -> tuple:
+    # One queue per result, they finish in any order
+    sum_queue, avg_queue = Queue(), Queue()
+    processes = [
+        Process(target=lesson10_process_prod.t2_sum_numbers, args=(numbers, sum_queue)),
+        Process(target=lesson10_process_prod.t3_average_numbers, args=(numbers, avg_queue)),
+    ]
+    for process in processes:
+        process.start()
+    results = sum_queue.get(), avg_queue.get()
+    for process in processes:
+        process.join()
+    return results
+
+
+def stats_pool(numbers: list) -> tuple:
+    with Pool(cpu_count()) as pool:
+        results_sum = pool.apply_async(lesson10_process_prod_optimus.t2_sum_numbers, (numbers,))
+        results_avg = pool.apply_async(lesson10_process_prod_optimus.t3_average_numbers, (numbers,))
+        return results_sum.get(), results_avg.get()
+
+
+def stats_async(numbers: list) -> tuple:
+    async def run():
+        return await lesson10_async.t2_sum_numbers(numbers), await lesson10_async.t3_average_numbers(numbers)
+    return asyncio.run(run())
+
+
+# name: (workload, strategy)
+STRATEGIES = {
+    "simple": ("stats", stats_simple),
+    "threads": ("stats", stats_threads),
+    "process": ("stats", stats_process),
+    "pool": ("stats", stats_pool),
+    "async": ("stats", stats_async),
+    "process_optimize": ("primes", process_optimize),
+    "process_optimize_optimus": ("primes", process_optimize_optimus),
+    "process_optimize_optimus_aplly": ("primes", process_optimize_optimus_aplly),
+    "count_primes": ("primes", count_primes),
+}
+
+
+def make_input(workload: str, size: int, seed: int) -> list:
+    """The same seed and size give every strategy identical input"""
+    if workload == "primes":
+        return list(range(1, size + 1))
+    rng = random.Random(seed)
+    return [rng.randint(1, 100) for _ in range(size)]
+
+
+def percentile(values: list, share: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * share) - 1)]
+
+
+def children_cpu_time() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def live_children_cpu_time() -> float:
+    """
+    CPU seconds used so far by the running child processes, such as the warm pool workers.
+    getrusage only counts children once they are reaped, so this reads /proc (Linux).
+    """
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0.0
+    for child in active_children():
+        try:
+            with open(f"/proc/{child.pid}/stat") as file:
+                # The fields after the command name start with the state, utime and stime are the 12th and 13th
+                fields = file.read().rsplit(")", 1)[1].split()
+        except FileNotFoundError:
+            continue
+        total += (int(fields[11]) + int(fields[12])) / ticks
+    return total
+
+
+def run_strategy(name: str, size: int, seed: int, warmup: int, repeats: int, start_method: str, queue):
+    """
+    Runs in a fresh interpreter, so peak RSS belongs to this strategy only.
+    The interpreter is spawned, start_method is what the strategy's own processes and pools use.
+    """
+    set_start_method(start_method, force=True)
+    worker_pool.configure(start_method=start_method)
+    workload, strategy = STRATEGIES[name]
+    numbers = make_input(workload, size, seed)
+
+    for _ in range(warmup):
+        strategy(numbers)
+
+    wall_times = []
+    cpu_start = process_time()
+    # The warm pool outlives the loop, only its CPU between the two readings counts, not its startup or shutdown
+    children_start = children_cpu_time() + live_children_cpu_time()
+    for _ in range(repeats):
+        start = perf_counter()
+        result = strategy(numbers)
+        wall_times.append(perf_counter() - start)
+    children_time = children_cpu_time() + live_children_cpu_time() - children_start
+    cpu_time = process_time() - cpu_start + children_time
+    worker_pool.shutdown()
+
+    queue.put({
+        "strategy": name,
+        "workload": workload,
+        "size": size,
+        "result": result,
+        "median_s": median(wall_times),
+        "p95_s": percentile(wall_times, 0.95),
+        # CPU of this process and of the worker processes during the timed loop, per repeat
+        "cpu_s": cpu_time / repeats,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "children_peak_rss_kib": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every lesson10 strategy on identical inputs.")
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--stats-size", type=int, default=STATS_SIZE, help="Length of the random numbers list.")
+    parser.add_argument("--primes-size", type=int, default=PRIMES_SIZE, help="Count primes in 1..primes-size.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--start-method", choices=worker_pool.START_METHODS, default=get_start_method(),
+                        help="Start method of the strategies' processes (default: the platform's).")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    context = get_context("spawn")
+    results = []
+    print(f"{'strategy':<32}{'median, s':>11}{'p95, s':>11}{'cpu, s':>11}{'peak RSS, MiB':>15}")
+    for name in args.strategies:
+        size = args.primes_size if STRATEGIES[name][0] == "primes" else args.stats_size
+        queue = context.Queue()
+        process = context.Process(target=run_strategy,
+                                  args=(name, size, args.seed, args.warmup, args.repeats, args.start_method, queue))
+        process.start()
+        report = queue.get()
+        process.join()
+        results.append(report)
+        print(f"{name:<32}{report['median_s']:>11.4f}{report['p95_s']:>11.4f}{report['cpu_s']:>11.4f}"
+              f"{report['peak_rss_kib'] / 1024:>15.1f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": cpu_count(),
+                "start_method": args.start_method,
+                "seed": args.seed,
+                "warmup": args.warmup,
+                "repeats": args.repeats,
+                "results": results,
+            }, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
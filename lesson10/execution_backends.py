@@ -0,0 +1,155 @@
+import argparse
+import concurrent.futures
+import logging
+import os
+from multiprocessing import cpu_count
+from lesson10.Timer import TimerContext
+from lesson10.lesson10_function_optimus_prod import get_primes_amount, split_into_chunks
+
+# Constants
+ENV_VAR = "LESSON10_EXECUTOR"
+DEFAULT_BACKEND = "serial"
+
+BACKENDS = {}
+
+
+def register_backend(cls):
+    """Class decorator: make the backend selectable by its name"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+class ExecutionBackend:
+    """
+    Runs a function over an iterable of tasks and returns the results in order.
+    Use it as a context manager, or call close() when done.
+    """
+
+    name = None
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or cpu_count()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def map(self, func, iterable) -> list:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+@register_backend
+class SerialBackend(ExecutionBackend):
+    name = "serial"
+
+    def map(self, func, iterable) -> list:
+        return list(map(func, iterable))
+
+
+class ExecutorBackend(ExecutionBackend):
+    """Backend on top of a concurrent.futures executor, started on first use"""
+
+    def __init__(self, workers: int | None = None):
+        super().__init__(workers)
+        self._executor = None
+
+    def create_executor(self):
+        raise NotImplementedError
+
+    def map(self, func, iterable) -> list:
+        if self._executor is None:
+            self._executor = self.create_executor()
+        return list(self._executor.map(func, iterable))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+@register_backend
+class ThreadPoolBackend(ExecutorBackend):
+    name = "thread"
+
+    def create_executor(self):
+        return concurrent.futures.ThreadPoolExecutor(self.workers)
+
+
+@register_backend
+class ProcessPoolBackend(ExecutorBackend):
+    name = "process"
+
+    def create_executor(self):
+        return concurrent.futures.ProcessPoolExecutor(self.workers)
+
+
+@register_backend
+class SubInterpreterBackend(ExecutorBackend):
+    """One sub-interpreter with its own GIL per worker, needs Python 3.14+"""
+
+    name = "subinterpreter"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return hasattr(concurrent.futures, "InterpreterPoolExecutor")
+
+    def create_executor(self):
+        return concurrent.futures.InterpreterPoolExecutor(self.workers)
+
+
+def available_backends() -> list[str]:
+    return [name for name, cls in BACKENDS.items() if cls.is_available()]
+
+
+def get_backend(name: str | None = None, workers: int | None = None) -> ExecutionBackend:
+    """Create a backend by name, falling back to the LESSON10_EXECUTOR variable and then to serial"""
+    name = name or os.environ.get(ENV_VAR) or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown execution backend: {name}. Choose from {list(BACKENDS)}.")
+    if not BACKENDS[name].is_available():
+        raise RuntimeError(f"Execution backend {name} is not supported by this Python version.")
+    return BACKENDS[name](workers)
+
+
+def add_backend_argument(parser: argparse.ArgumentParser):
+    """Only the backends this Python supports are offered"""
+    parser.add_argument(
+        "--executor",
+        choices=available_backends(),
+        default=None,
+        help=f"Execution backend (default: ${ENV_VAR} or {DEFAULT_BACKEND}).",
+    )
+
+
+def count_primes_on_backend(numbers: list, backend: ExecutionBackend, counter=get_primes_amount) -> int:
+    """Split numbers into one chunk per worker and count primes on the backend"""
+    chunks = list(split_into_chunks(numbers, -(-len(numbers) // backend.workers) or 1))
+    return sum(backend.map(counter, chunks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count primes on a selectable execution backend.")
+    add_backend_argument(parser)
+    parser.add_argument("--size", type=int, default=500000, help="Count primes in 1..size (default: 500000).")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        backend = get_backend(args.executor, args.workers)
+    except (ValueError, RuntimeError) as e:
+        # e.g. an unsupported backend in the LESSON10_EXECUTOR variable
+        parser.error(str(e))
+
+    with backend:
+        logging.info(f"Execution backend: {backend.name}, workers: {backend.workers}")
+        with TimerContext():
+            print(count_primes_on_backend(list(range(1, args.size + 1)), backend))
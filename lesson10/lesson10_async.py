@@ -1,32 +1,95 @@
-import random
-from statistics import mean
+import argparse
 import asyncio
+from statistics import mean
 from lesson10.Timer import TimerContext
+from lesson10.numeric_backend import BACKENDS, PythonBackend, get_backend
+from lesson10.prime_sieve import count_primes
+from lesson10 import worker_pool
 
+# Constants
+MODES = ("blocking", "offloaded")
+PROBE_INTERVAL = 0.01
 
 
-def t1_gen_numbers(length: int)->list:
+def t1_gen_numbers(length: int, backend=PythonBackend)->list:
     """Generate numbers"""
-    return [random.randint(1, 100) for _ in range(length)]
+    return backend.gen_numbers(length)
 
 
-async def t2_sum_numbers(numbers:list)->int:
+async def t2_sum_numbers(numbers:list, backend=PythonBackend)->int:
     """Receive numbers and calculate their sum"""
-    return sum(numbers)
+    return backend.sum_numbers(numbers)
 
 
-async def t3_average_numbers(numbers:list)->float:
+async def t3_average_numbers(numbers:list, backend=PythonBackend)->float:
     """Wait for numbers and calculate their average"""
-    return mean(numbers)
+    return backend.average_numbers(numbers)
+
+async def run_in_process(func, *args):
+    """Run a CPU-bound function on the shared process executor, the loop keeps serving other tasks"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(worker_pool.get_executor(), func, *args)
+
+
+async def compute_sum(numbers:list, backend=PythonBackend)->int:
+    return await run_in_process(backend.sum_numbers, numbers)
+
+
+async def compute_average(numbers:list, backend=PythonBackend)->float:
+    return await run_in_process(backend.average_numbers, numbers)
+
 
-async def main ():
+async def compute_primes_amount(numbers:list)->int:
+    return await run_in_process(count_primes, numbers)
+
+
+async def loop_lag_probe(stop: asyncio.Event, interval: float = PROBE_INTERVAL)->list:
+    """Sleep for interval until stop is set, record how late every wake-up was"""
+    loop = asyncio.get_running_loop()
+    lags = []
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - start - interval)
+    return lags
+
+
+async def main (backend: str = "python", mode: str = "blocking"):
     length = 10000000
+    backend = get_backend(backend)
 
-    numbers = t1_gen_numbers(length)
-    print(f"\nResult T2: {await t2_sum_numbers(numbers):5f}")
-    print(f"\nResult T3: {await t3_average_numbers(numbers):5f}")
+    numbers = t1_gen_numbers(length, backend)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(stop))
+    await asyncio.sleep(0)
+
+    if mode == "offloaded":
+        total, average, primes = await asyncio.gather(
+            compute_sum(numbers, backend),
+            compute_average(numbers, backend),
+            compute_primes_amount(numbers),
+        )
+        print(f"\nResult T2: {total:5f}")
+        print(f"\nResult T3: {average:5f}")
+        print(f"\nPrimes amount: {primes}")
+    else:
+        print(f"\nResult T2: {await t2_sum_numbers(numbers, backend):5f}")
+        print(f"\nResult T3: {await t3_average_numbers(numbers, backend):5f}")
+
+    stop.set()
+    lags = await probe
+    if lags:
+        print(f"\nLoop lag: max {max(lags) * 1000:.1f} ms, mean {mean(lags) * 1000:.1f} ms, {len(lags)} wake-ups")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sum and average of random numbers with asyncio.")
+    parser.add_argument("--backend", choices=BACKENDS, default="python")
+    parser.add_argument("--mode", choices=MODES, default="blocking",
+                        help="offloaded runs the reductions and prime counting on a process executor.")
+    args = parser.parse_args()
+
     with TimerContext():
-        asyncio.run(main())
+        asyncio.run(main(args.backend, args.mode))
+    worker_pool.shutdown()
@@ -1,9 +1,10 @@
 import math
 import logging
 from lesson10.Timer import TimerContext
-from multiprocessing import Process,Queue,cpu_count
+from multiprocessing import Queue,cpu_count
 from lesson10.lesson10_function_optimus_prod_apply import process_optimize_optimus_aplly
-from lesson10_function_optimus_prod import process_optimize_optimus
+from lesson10.lesson10_function_optimus_prod import process_optimize_optimus
+from lesson10 import worker_pool
 
 
 def get_primes_amount_simple(num: list) -> int:
@@ -27,17 +28,22 @@ def get_primes_amount_and_send(num: list, queue: Queue) -> None:
     queue.put(result)
 
 
-def process_optimize(num: list) -> int:
-    n_processes = cpu_count()
+def process_optimize(num: list, reuse_pool: bool = True) -> int:
+    n_processes = worker_pool.pool_size() if reuse_pool else cpu_count()
     logging.info(f"CPU count: {cpu_count()}")
     chunk_size = math.ceil(len(num) / n_processes)
     numbers_chunks = [num[i:i + chunk_size] for i in range(0, len(num), chunk_size) if num[i:i + chunk_size]]
 
+    if reuse_pool:
+        return sum(worker_pool.get_pool().map(get_primes_amount_simple, numbers_chunks))
+
+    # Same start method as the shared pool
+    context = worker_pool.get_start_context()
     processes = []
-    queue = Queue()
+    queue = context.Queue()
 
     for chunk in numbers_chunks:
-        process = Process(target=get_primes_amount_and_send, args=(chunk, queue))
+        process = context.Process(target=get_primes_amount_and_send, args=(chunk, queue))
         processes.append(process)
 
     for process in processes:
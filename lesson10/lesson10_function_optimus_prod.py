@@ -1,11 +1,27 @@
-from multiprocessing import Pool, cpu_count,Pipe
+import logging
+import os
+from collections import defaultdict
+from itertools import accumulate
+from functools import partial
+from math import isqrt
+from time import perf_counter
+from multiprocessing import cpu_count,Pipe
 from lesson10.Timer import TimerContext
+from lesson10.prime_sieve import count_primes
+from lesson10.prime_index import PrimeIndex, count_primes_with_index, index_limit
+from lesson10.primality import TRIAL_DIVISION_LIMIT, is_prime_mr, miller_rabin_cost
+from lesson10 import worker_pool
 
+# Constants
+CHUNKS_PER_WORKER = 8
+SCHEDULES = ("static", "cost", "stride")
 
 
 def is_prime(num):
     if num < 2:
         return False
+    if num >= TRIAL_DIVISION_LIMIT:
+        return is_prime_mr(num)
     for i in range(2, int(num ** 0.5) + 1):
         if num % i == 0:
             return False
@@ -20,14 +36,121 @@ def split_into_chunks(lst, n):
         yield lst[i:i + n]
 
 
-def process_optimize_optimus(numbers: list) -> int:
-    chunks = list(split_into_chunks(numbers, len(numbers) // cpu_count() or 1))
-    with Pool(cpu_count()) as pool:
-        results = pool.map(get_primes_amount, chunks)
-    return sum(results)
+def trial_division_cost(num: int) -> int:
+    """Trial division of num takes about sqrt(num) steps, large numbers go to Miller-Rabin"""
+    if num >= TRIAL_DIVISION_LIMIT:
+        return miller_rabin_cost(num)
+    return isqrt(num) + 1 if num > 1 else 1
+
+
+def split_by_cost(lst, n_chunks, cost=trial_division_cost):
+    """Split lst into contiguous chunks with roughly equal total cost"""
+    if cost is None:
+        yield from split_into_chunks(lst, -(-len(lst) // n_chunks) or 1)
+        return
+    prefix = list(accumulate(cost(num) for num in lst))
+    if not prefix:
+        return
+    target = prefix[-1] / n_chunks
+    start = 0
+    bound = target
+    for i, total in enumerate(prefix):
+        if total >= bound:
+            yield lst[start:i + 1]
+            start = i + 1
+            bound = total + target
+    if start < len(lst):
+        yield lst[start:]
+
+
+def split_strided(lst, n):
+    """Interleave lst into n chunks: chunk k gets lst[k], lst[k + n], ..."""
+    for i in range(min(n, len(lst))):
+        yield lst[i::n]
+
+
+def get_primes_amount_timed(task: tuple) -> tuple[int, int, float]:
+    """Run counter over a chunk, return (result, worker pid, busy seconds)"""
+    counter, chunk = task
+    start = perf_counter()
+    result = counter(chunk)
+    return result, os.getpid(), perf_counter() - start
+
+
+def run_scheduled(pool, counter, numbers: list, schedule: str, n_workers: int) -> tuple[int, dict]:
+    """
+    Feed small chunks through imap_unordered, so an idle worker steals the next one.
+    Cost and stride splitting only pay off for trial division (get_primes_amount);
+    any other counter gets equal contiguous chunks, since a sieve over a strided
+    chunk would run all the way up to max(numbers) for every chunk.
+    Returns the total and busy seconds per worker pid.
+    """
+    n_chunks = n_workers * CHUNKS_PER_WORKER
+    trial_division = counter is get_primes_amount
+    if schedule == "cost":
+        chunks = split_by_cost(numbers, n_chunks, trial_division_cost if trial_division else None)
+    elif schedule == "stride":
+        chunks = split_strided(numbers, n_chunks) if trial_division else split_by_cost(numbers, n_chunks, None)
+    else:
+        raise ValueError(f"Unknown schedule: {schedule}. Choose from {SCHEDULES}.")
+
+    total = 0
+    busy = defaultdict(float)
+    for result, pid, busy_time in pool.imap_unordered(get_primes_amount_timed, ((counter, chunk) for chunk in chunks)):
+        total += result
+        busy[pid] += busy_time
+    return total, dict(busy)
+
+
+def log_worker_busy_time(busy: dict):
+    for pid, busy_time in sorted(busy.items()):
+        logging.info(f"Worker {pid} busy: {busy_time:.6f} seconds")
+    if busy:
+        average = sum(busy.values()) / len(busy)
+        logging.info(f"Load imbalance (max / average busy): {max(busy.values()) / (average or 1):.3f}")
+
+
+def run_on_pool(pool, counter, numbers: list, schedule: str, n_workers: int) -> int:
+    if schedule == "static":
+        chunks = list(split_into_chunks(numbers, len(numbers) // n_workers or 1))
+        return sum(pool.map(counter, chunks))
+    total, busy = run_scheduled(pool, counter, numbers, schedule, n_workers)
+    log_worker_busy_time(busy)
+    return total
+
+
+def process_optimize_optimus(numbers: list, counter=count_primes, index_path: str | None = None,
+                             schedule: str = "static", reuse_pool: bool = True) -> int:
+    """
+    Count primes on a Pool of workers.
+    schedule="static" gives every worker one contiguous slice,
+    "cost" and "stride" balance the load dynamically (see run_scheduled),
+    with the default sieve counter both use equal contiguous chunks.
+    reuse_pool=True runs on the shared warm pool from worker_pool,
+    False starts and stops a Pool(cpu_count()) for this call only,
+    with the start method configured in worker_pool.
+    """
+    if index_path is not None and numbers:
+        # Extend the index once here, workers only map it read-only
+        with PrimeIndex(index_path) as index:
+            index.extend(index_limit(numbers))
+        counter = partial(count_primes_with_index, index_path)
+
+    if reuse_pool:
+        return run_on_pool(worker_pool.get_pool(), counter, numbers, schedule, worker_pool.pool_size())
+    with worker_pool.get_start_context().Pool(cpu_count()) as pool:
+        return run_on_pool(pool, counter, numbers, schedule, cpu_count())
 
 
 if __name__ == "__main__":
 
     with TimerContext():
-        print(process_optimize_optimus(list(range(1,5000000))))
\ No newline at end of file
+        print(process_optimize_optimus(list(range(1,5000000))))
+
+    with TimerContext():
+        print(process_optimize_optimus(list(range(1,5000000)), index_path="primes"))
+
+    for schedule in SCHEDULES:
+        logging.info(f"Trial division, schedule: {schedule}")
+        with TimerContext():
+            print(process_optimize_optimus(list(range(1,2000000)), counter=get_primes_amount, schedule=schedule))
\ No newline at end of file
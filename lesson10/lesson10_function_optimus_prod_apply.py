@@ -1,22 +1,79 @@
-from multiprocessing import Pool, cpu_count
+import logging
+import queue
+from threading import Event
+from multiprocessing import cpu_count
 from lesson10.Timer import TimerContext
+from lesson10 import worker_pool
+from lesson10.lesson10_function_optimus_prod import is_prime
 
+# Constants
+CHUNKS_PER_WORKER = 8
 
 
-def is_prime(num):
-    if num < 2:
-        return False
-    for i in range(2, int(num ** 0.5) + 1):
-        if num % i == 0:
-            return False
-    return True
-
 def get_primes_amount(numbers: list) -> int:
       return sum(1 for i in numbers if is_prime(i))
 
 
-def process_optimize_optimus_aplly(numbers: list) -> int:
-   with Pool(cpu_count()) as pool:
+def fan_out(pool, numbers: list, n_workers: int, chunk_size: int | None = None,
+            on_partial=None, on_progress=None, cancel: Event | None = None) -> int:
+    """
+    Split numbers into chunks and submit them with apply_async.
+    At most 2 * n_workers chunks are in flight, so cancel stops a large input early.
+
+    :param on_partial: called as on_partial(chunk_index, count) when a chunk finishes
+    :param on_progress: called as on_progress(done, total) after every finished chunk
+    :param cancel: once set, no more chunks are submitted; chunks in flight still finish
+        and the sum of the finished chunks is returned
+    """
+    chunk_size = chunk_size or -(-len(numbers) // (n_workers * CHUNKS_PER_WORKER)) or 1
+    starts = range(0, len(numbers), chunk_size)
+    partials = [None] * len(starts)
+    finished = queue.Queue()
+    max_in_flight = 2 * n_workers
+    submitted = done = 0
+
+    while done < len(starts):
+        while submitted < len(starts) and submitted - done < max_in_flight and not (cancel and cancel.is_set()):
+            start = starts[submitted]
+            pool.apply_async(
+                get_primes_amount,
+                (numbers[start:start + chunk_size],),
+                # Callbacks run in the pool result thread, hand results over to this one
+                callback=lambda count, index=submitted: finished.put((index, count, None)),
+                error_callback=lambda error, index=submitted: finished.put((index, None, error)),
+            )
+            submitted += 1
+        if submitted == done:
+            logging.warning(f"Fan-out cancelled after {done} of {len(starts)} chunks.")
+            break
+
+        index, count, error = finished.get()
+        if error is not None:
+            raise error
+        partials[index] = count
+        done += 1
+        if on_partial:
+            on_partial(index, count)
+        if on_progress:
+            on_progress(done, len(starts))
+
+    return sum(count for count in partials if count is not None)
+
+
+def process_optimize_optimus_aplly(numbers: list, reuse_pool: bool = True, fan_out_chunks: bool = False,
+                                   **fan_out_kwargs) -> int:
+   """
+   fan_out_chunks=False sends the whole list to one worker with apply,
+   True spreads it over the pool, see fan_out for the extra keyword arguments.
+   """
+   if reuse_pool:
+        pool = worker_pool.get_pool()
+        if fan_out_chunks:
+            return fan_out(pool, numbers, worker_pool.pool_size(), **fan_out_kwargs)
+        return pool.apply(get_primes_amount, (numbers,))
+   with worker_pool.get_start_context().Pool(cpu_count()) as pool:
+        if fan_out_chunks:
+            return fan_out(pool, numbers, cpu_count(), **fan_out_kwargs)
         results = pool.apply(get_primes_amount, (numbers,))
         return  results
 
@@ -24,4 +81,11 @@ def process_optimize_optimus_aplly(numbers: list) -> int:
 if __name__ == "__main__":
 
     with TimerContext():
-        print(process_optimize_optimus_aplly(list(range(1,5000000))))
\ No newline at end of file
+        print(process_optimize_optimus_aplly(list(range(1,5000000))))
+
+    with TimerContext():
+        print(process_optimize_optimus_aplly(
+            list(range(1,5000000)),
+            fan_out_chunks=True,
+            on_progress=lambda done, total: logging.info(f"Chunks done: {done}/{total}"),
+        ))
\ No newline at end of file
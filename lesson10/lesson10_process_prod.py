@@ -1,29 +1,143 @@
+import argparse
 import random
+import resource
+from array import array
 from statistics import mean
-from multiprocessing import Process,Queue
+from time import perf_counter
+from multiprocessing import Process,Queue,get_context
+from multiprocessing.shared_memory import SharedMemory
 from lesson10.Timer import TimerContext
+from lesson10.numeric_backend import BACKENDS, PythonBackend, get_backend
+from lesson10.parallel_generation import process_sum_average
 
+# Constants
+LENGTH = 10000000
+TYPECODE = "b"  # values 1..100 fit into a signed byte
+MODES = ("pickled", "shared", "seeded")
 
-def t1_gen_numbers(length: int)->list:
+
+def t1_gen_numbers(length: int, backend=PythonBackend)->list:
     """Generate numbers"""
-    return [random.randint(1, 100) for _ in range(length)]
+    return backend.gen_numbers(length)
 
-def t2_sum_numbers(list,queue)->int:
+def t2_sum_numbers(list,queue,backend=PythonBackend)->int:
     """Reicieve numbers and calculate their sum"""
-    queue.put(sum(list))
+    queue.put(backend.sum_numbers(list))
 
-def t3_average_numbers(list,queue)->float:
+def t3_average_numbers(list,queue,backend=PythonBackend)->float:
     """Wait for numbers and calculate their average"""
-    queue.put(mean(list))
+    queue.put(backend.average_numbers(list))
+
+def t1_gen_numbers_compact(length: int) -> array:
+    """Generate numbers straight into a typed array, no intermediate list"""
+    return array(TYPECODE, (random.randint(1, 100) for _ in range(length)))
+
+
+def share_numbers(data: array) -> SharedMemory:
+    """Copy the typed array once into a shared memory block"""
+    shm = SharedMemory(create=True, size=max(len(data) * data.itemsize, 1))
+    shm.buf[:len(data) * data.itemsize] = data.tobytes()
+    return shm
+
+
+def attach_numbers(name: str):
+    """Attach to the shared block by name, without copying it"""
+    shm = SharedMemory(name=name)
+    return shm, shm.buf.cast(TYPECODE)
+
+
+def t2_sum_numbers_shared(name: str, length: int, queue):
+    """Attach to the shared numbers and calculate their sum"""
+    shm, numbers = attach_numbers(name)
+    try:
+        queue.put(("sum", sum(numbers[:length])))
+    finally:
+        numbers.release()
+        shm.close()
+
+
+def t3_average_numbers_shared(name: str, length: int, queue):
+    """Attach to the shared numbers and calculate their average"""
+    shm, numbers = attach_numbers(name)
+    try:
+        queue.put(("avg", mean(numbers[:length])))
+    finally:
+        numbers.release()
+        shm.close()
+
+
+def main_shared(length: int = LENGTH):
+    numbers = t1_gen_numbers_compact(length)
+    shm = share_numbers(numbers)
+    del numbers
+    queue = Queue()
+
+    try:
+        processes = [
+            Process(target=t2_sum_numbers_shared, args=(shm.name, length, queue)),
+            Process(target=t3_average_numbers_shared, args=(shm.name, length, queue)),
+        ]
 
-def main ():
+        for process in processes:
+            process.start()
 
-    numbers = t1_gen_numbers(10000000)
+        results = dict(queue.get() for _ in processes)
+
+        for process in processes:
+            process.join()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    print(f"Results from processes:\nSum Number:{results['sum']} \nAvg Number:{results['avg']}")
+
+
+def main_seeded(length: int = LENGTH, master_seed: int = 0, workers: int | None = None, backend: str = "python"):
+    """Every process generates its own blocks from master_seed, only (sum, count) goes through the Queue"""
+    total, average = process_sum_average(length, master_seed, workers, backend=get_backend(backend))
+    print(f"Results from processes:\nSum Number:{total} \nAvg Number:{average}")
+
+
+def measure(mode: str, length: int, queue):
+    """Run one mode and report time and peak RSS (KiB on Linux) of the parent and its children"""
+    start = perf_counter()
+    if mode == "shared":
+        main_shared(length)
+    elif mode == "seeded":
+        main_seeded(length)
+    else:
+        main(length)
+    queue.put({
+        "mode": mode,
+        "seconds": perf_counter() - start,
+        "parent_peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "children_peak_rss": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    })
+
+
+def compare(length: int = LENGTH):
+    """Run every mode in a fresh interpreter, so peak RSS of one does not leak into the other"""
+    context = get_context("spawn")
+    for mode in MODES:
+        queue = context.Queue()
+        process = context.Process(target=measure, args=(mode, length, queue))
+        process.start()
+        report = queue.get()
+        process.join()
+        print(f"{report['mode']:<8} time: {report['seconds']:.3f} s, "
+              f"parent peak RSS: {report['parent_peak_rss'] / 1024:.1f} MiB, "
+              f"children peak RSS: {report['children_peak_rss'] / 1024:.1f} MiB")
+
+
+def main (length: int = LENGTH, backend: str = "python"):
+
+    backend = get_backend(backend)
+    numbers = t1_gen_numbers(length, backend)
     queue = Queue()
 
     processes = [
-        Process(target=t2_sum_numbers, args=(numbers, queue)),
-        Process(target=t3_average_numbers, args=(numbers, queue)),
+        Process(target=t2_sum_numbers, args=(numbers, queue, backend)),
+        Process(target=t3_average_numbers, args=(numbers, queue, backend)),
     ]
 
     for process in processes:
@@ -37,5 +151,20 @@ def main ():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sum and average of random numbers in two processes.")
+    parser.add_argument("--mode", choices=MODES + ("compare",), default="pickled")
+    parser.add_argument("--length", type=int, default=LENGTH)
+    parser.add_argument("--backend", choices=BACKENDS, default="python", help="Used by the pickled and seeded modes.")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed of the seeded mode.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes of the seeded mode (default: CPU count).")
+    args = parser.parse_args()
+
     with TimerContext():
-        main()
+        if args.mode == "compare":
+            compare(args.length)
+        elif args.mode == "shared":
+            main_shared(args.length)
+        elif args.mode == "seeded":
+            main_seeded(args.length, args.seed, args.workers, args.backend)
+        else:
+            main(args.length, args.backend)
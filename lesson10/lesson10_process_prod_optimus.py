@@ -1,32 +1,48 @@
-import random
-from statistics import mean
+import argparse
 from multiprocessing import Pool,cpu_count
 from lesson10.Timer import TimerContext
+from lesson10.numeric_backend import BACKENDS, PythonBackend, get_backend
+from lesson10.parallel_generation import pool_sum_average
 
 
-def t1_gen_numbers(length: int)->list:
+def t1_gen_numbers(length: int, backend=PythonBackend)->list:
     """Generate numbers"""
-    return [random.randint(1, 100) for _ in range(length)]
+    return backend.gen_numbers(length)
 
-def t2_sum_numbers(numbers:list)->int:
+def t2_sum_numbers(numbers:list, backend=PythonBackend)->int:
     """Reicieve numbers and calculate their sum"""
-    return sum(numbers)
+    return backend.sum_numbers(numbers)
 
-def t3_average_numbers(numbers:list)->float:
+def t3_average_numbers(numbers:list, backend=PythonBackend)->float:
     """Wait for numbers and calculate their average"""
-    return mean(numbers)
+    return backend.average_numbers(numbers)
 
-def main ():
+def main (backend: str = "python", seed: int | None = None, workers: int | None = None):
 
-    numbers = t1_gen_numbers(10000000)
+    backend = get_backend(backend)
+    if seed is not None:
+        # Workers generate their own blocks, only the aggregates come back
+        total, average = pool_sum_average(10000000, seed, workers, backend=backend)
+        print(total)
+        print(average)
+        return
+
+    numbers = t1_gen_numbers(10000000, backend)
 
     with Pool(cpu_count()) as pool:
-        results_sum = pool.apply_async(t2_sum_numbers, (numbers,))
-        results_avg = pool.apply_async(t3_average_numbers,(numbers,))
+        results_sum = pool.apply_async(t2_sum_numbers, (numbers, backend))
+        results_avg = pool.apply_async(t3_average_numbers,(numbers, backend))
 
         print(results_sum.get())
         print(results_avg.get())
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sum and average of random numbers on a process pool.")
+    parser.add_argument("--backend", choices=BACKENDS, default="python")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Master seed: generate reproducible data inside the workers.")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count).")
+    args = parser.parse_args()
+
     with TimerContext():
-        main()
+        main(args.backend, args.seed, args.workers)
@@ -1,43 +1,48 @@
-import random
+import argparse
 from time import perf_counter
-from statistics import mean
 from lesson10.Timer import TimerContext
+from lesson10.numeric_backend import BACKENDS, PythonBackend, get_backend
 
 
-def t1_gen_numbers(length: int)->list:
+def t1_gen_numbers(length: int, backend=PythonBackend)->list:
     """Generate numbers"""
-    return [random.randint(1, 100) for _ in range(length)]
+    return backend.gen_numbers(length)
 
 
-def t2_sum_numbers(numbers:list)->int:
+def t2_sum_numbers(numbers:list, backend=PythonBackend)->int:
     """Reicieve numbers and calculate their sum"""
-    return sum(numbers)
+    return backend.sum_numbers(numbers)
 
 
-def t3_average_numbers(numbers:list)->float:
+def t3_average_numbers(numbers:list, backend=PythonBackend)->float:
     """Wait for numbers and calculate their average"""
-    return mean(numbers)
+    return backend.average_numbers(numbers)
 
-def main ():
+def main (backend: str = "python"):
     length = 10000000
+    backend = get_backend(backend)
 
     start = perf_counter()
-    numbers = t1_gen_numbers(length)
+    numbers = t1_gen_numbers(length, backend)
     end = perf_counter()
     print(f"\n🕓Time running T1: {end - start:5f} seconds")
 
 
     start = perf_counter()
-    print(f"\nResult T2: {t2_sum_numbers(numbers):5f}")
+    print(f"\nResult T2: {t2_sum_numbers(numbers, backend):5f}")
     end = perf_counter()
     print(f"\n🕓Time running T2: {end - start:5f} seconds")
 
     start = perf_counter()
-    print(f"\nResult T3: {t3_average_numbers(numbers):5f}")
+    print(f"\nResult T3: {t3_average_numbers(numbers, backend):5f}")
     end = perf_counter()
     print(f"\n🕓Time running T3: {end - start:5f} seconds")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sum and average of random numbers, one step after another.")
+    parser.add_argument("--backend", choices=BACKENDS, default="python")
+    args = parser.parse_args()
+
     with TimerContext():
-        main()
+        main(args.backend)
@@ -1,36 +1,100 @@
+import argparse
 import random
+from queue import Queue
 from statistics import mean
 from threading import Thread, Event
 from lesson10.Timer import TimerContext
+from lesson10.numeric_backend import BACKENDS, PythonBackend, get_backend
 
+# Constants
+LENGTH = 10000000
+BLOCK_SIZE = 100000
+QUEUE_BLOCKS = 4
+MODES = ("batch", "streaming")
 
-def t1_gen_numbers(length: int, numbers: list, num_ready: Event):
+
+def t1_gen_numbers(length: int, numbers: list, num_ready: Event, backend=PythonBackend):
     """Generate numbers"""
-    numbers.extend(random.randint(1, 100) for _ in range(length))
+    if backend is PythonBackend:
+        numbers.extend(random.randint(1, 100) for _ in range(length))
+    else:
+        # An array cannot extend a list without boxing every item, keep it as the only element
+        numbers.append(backend.gen_numbers(length))
     num_ready.set()
 
-def t2_sum_numbers(numbers:list, num_ready:Event, result:list):
+def t2_sum_numbers(numbers:list, num_ready:Event, result:list, backend=PythonBackend):
     """Wait for numbers and calculate their sum"""
     num_ready.wait()
-    result.append(sum(numbers))
+    result.append(sum(numbers) if backend is PythonBackend else backend.sum_numbers(numbers[0]))
 
-def t3_average_numbers(numbers:list,num_ready: Event, result:list):
+def t3_average_numbers(numbers:list,num_ready: Event, result:list, backend=PythonBackend):
     """Wait for numbers and calculate their average"""
     num_ready.wait()
-    result.append(mean(numbers))
+    result.append(mean(numbers) if backend is PythonBackend else backend.average_numbers(numbers[0]))
+
+
+def t1_gen_blocks(length: int, block_size: int, queues: list[Queue], backend=PythonBackend):
+    """Generate numbers block by block and hand every block to each consumer"""
+    for start in range(0, length, block_size):
+        block = backend.gen_numbers(min(block_size, length - start))
+        for queue in queues:
+            queue.put(block)
+    for queue in queues:
+        queue.put(None)
+
+def t2_sum_stream(blocks: Queue, result: list, backend=PythonBackend):
+    """Keep a running sum of the blocks until the producer sends None"""
+    total = 0
+    while (block := blocks.get()) is not None:
+        total += backend.sum_numbers(block)
+    result.append(total)
+
+def t3_average_stream(blocks: Queue, result: list, backend=PythonBackend):
+    """Keep a running sum, count and mean of the blocks until the producer sends None"""
+    total = count = 0
+    average = 0.0
+    while (block := blocks.get()) is not None:
+        total += backend.sum_numbers(block)
+        count += len(block)
+        # Exact integer division, same value as statistics.mean
+        average = total / count
+    result.append(average)
+
 
+def main_streaming(length: int = LENGTH, backend: str = "python", block_size: int = BLOCK_SIZE):
+    """Producer and consumers overlap, memory is bounded by QUEUE_BLOCKS blocks per consumer"""
+    backend = get_backend(backend)
+    sum_blocks = Queue(maxsize=QUEUE_BLOCKS)
+    avg_blocks = Queue(maxsize=QUEUE_BLOCKS)
+    sum_result = []
+    avg_result = []
+
+    threads = [
+    Thread (target=t1_gen_blocks, args=(length, block_size, [sum_blocks, avg_blocks], backend)),
+    Thread (target=t2_sum_stream, args=(sum_blocks, sum_result, backend)),
+    Thread (target=t3_average_stream, args=(avg_blocks, avg_result, backend))
+    ]
 
-def main():
-    length = 10000000
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"\nResult T2 (Sum): {sum_result[0]}")
+    print(f"\nResult T3 (Average): {avg_result[0]}")
+
+
+def main(length: int = LENGTH, backend: str = "python"):
+    backend = get_backend(backend)
     numbers= []
     sum_result = []
     avg_result = []
     num_ready = Event()
 
     threads = [
-    Thread (target=t1_gen_numbers, args=(length,numbers,num_ready)),
-    Thread (target=t2_sum_numbers, args=(numbers, num_ready,sum_result)),
-    Thread (target=t3_average_numbers, args=(numbers,num_ready,avg_result))
+    Thread (target=t1_gen_numbers, args=(length,numbers,num_ready,backend)),
+    Thread (target=t2_sum_numbers, args=(numbers, num_ready,sum_result,backend)),
+    Thread (target=t3_average_numbers, args=(numbers,num_ready,avg_result,backend))
     ]
 
     for thread in threads:
@@ -43,5 +107,15 @@ def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sum and average of random numbers in three threads.")
+    parser.add_argument("--backend", choices=BACKENDS, default="python")
+    parser.add_argument("--mode", choices=MODES, default="batch")
+    parser.add_argument("--length", type=int, default=LENGTH)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE, help="Used by the streaming mode.")
+    args = parser.parse_args()
+
     with TimerContext():
-        main()
\ No newline at end of file
+        if args.mode == "streaming":
+            main_streaming(args.length, args.backend, args.block_size)
+        else:
+            main(args.length, args.backend)
\ No newline at end of file
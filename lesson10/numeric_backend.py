@@ -0,0 +1,69 @@
+import logging
+import random
+from statistics import mean
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Constants
+BACKENDS = ("python", "numpy")
+
+
+class PythonBackend:
+    """Generate, sum and average numbers with plain lists"""
+
+    name = "python"
+
+    @staticmethod
+    def gen_numbers(length: int, seed=None) -> list:
+        rng = random if seed is None else random.Random(seed)
+        return [rng.randint(1, 100) for _ in range(length)]
+
+    @staticmethod
+    def block_seed(master_seed: int, index: int) -> str:
+        # str seeds are hashed with SHA-512, stable across runs and PYTHONHASHSEED
+        return f"{master_seed}:{index}"
+
+    @staticmethod
+    def sum_numbers(numbers) -> int:
+        return sum(numbers)
+
+    @staticmethod
+    def average_numbers(numbers) -> float:
+        return mean(numbers)
+
+
+class NumpyBackend:
+    """Same steps on an int8 array, reduced natively without Python objects per item"""
+
+    name = "numpy"
+
+    @staticmethod
+    def gen_numbers(length: int, seed=None):
+        return np.random.default_rng(seed).integers(1, 101, size=length, dtype=np.int8)
+
+    @staticmethod
+    def block_seed(master_seed: int, index: int):
+        return np.random.SeedSequence(master_seed, spawn_key=(index,))
+
+    @staticmethod
+    def sum_numbers(numbers) -> int:
+        # Accumulate in int64, int8 would overflow
+        return int(numbers.sum(dtype=np.int64))
+
+    @staticmethod
+    def average_numbers(numbers) -> float:
+        return float(numbers.mean(dtype=np.float64))
+
+
+def get_backend(name: str = "python"):
+    """Return the backend class by name, NumPy falls back to Python if it is not installed"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}. Choose from {BACKENDS}.")
+    if name == "numpy":
+        if np is not None:
+            return NumpyBackend
+        logging.warning("NumPy is not installed, falling back to the pure-Python backend.")
+    return PythonBackend
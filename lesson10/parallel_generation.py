@@ -0,0 +1,70 @@
+from multiprocessing import Pool, Process, Queue, cpu_count
+from lesson10.numeric_backend import PythonBackend
+
+# Constants
+BLOCK_SIZE = 1 << 20
+
+
+def iter_blocks(length: int, block_size: int = BLOCK_SIZE):
+    """
+    Yield (index, size) of every block. The layout only depends on length and
+    block_size, never on the worker count, so the generated data is the same.
+    """
+    for index, start in enumerate(range(0, length, block_size)):
+        yield index, min(block_size, length - start)
+
+
+def block_aggregate(task: tuple) -> tuple[int, int]:
+    """Generate one block from its own seed and return only (sum, count)"""
+    master_seed, index, size, backend = task
+    block = backend.gen_numbers(size, backend.block_seed(master_seed, index))
+    return backend.sum_numbers(block), size
+
+
+def combine(aggregates) -> tuple[int, float]:
+    """Merge (sum, count) pairs into the total sum and average"""
+    total = count = 0
+    for block_sum, block_count in aggregates:
+        total += block_sum
+        count += block_count
+    return total, total / count if count else 0.0
+
+
+def pool_sum_average(length: int, master_seed: int, processes: int | None = None,
+                     block_size: int = BLOCK_SIZE, backend=PythonBackend) -> tuple[int, float]:
+    """Every Pool worker generates its blocks, only aggregates come back"""
+    tasks = [(master_seed, index, size, backend) for index, size in iter_blocks(length, block_size)]
+    with Pool(processes or cpu_count()) as pool:
+        return combine(pool.imap_unordered(block_aggregate, tasks))
+
+
+def worker_blocks(master_seed: int, blocks: list, backend, queue: Queue):
+    """Process target: aggregate the assigned blocks and put one (sum, count) on the queue"""
+    total = count = 0
+    for index, size in blocks:
+        block_sum, block_count = block_aggregate((master_seed, index, size, backend))
+        total += block_sum
+        count += block_count
+    queue.put((total, count))
+
+
+def process_sum_average(length: int, master_seed: int, workers: int | None = None,
+                        block_size: int = BLOCK_SIZE, backend=PythonBackend) -> tuple[int, float]:
+    """Same as pool_sum_average with one Process per worker and a Queue"""
+    workers = workers or cpu_count()
+    blocks = list(iter_blocks(length, block_size))
+    queue = Queue()
+    processes = [
+        Process(target=worker_blocks, args=(master_seed, blocks[worker::workers], backend, queue))
+        for worker in range(min(workers, len(blocks)))
+    ]
+
+    for process in processes:
+        process.start()
+
+    aggregates = [queue.get() for _ in processes]
+
+    for process in processes:
+        process.join()
+
+    return combine(aggregates)
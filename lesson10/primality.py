@@ -0,0 +1,41 @@
+# Constants
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+# The first 13 primes as bases make Miller-Rabin deterministic for every n below this bound (~3.3 * 10**24)
+WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MR_EXACT_LIMIT = 3317044064679887385961981
+TRIAL_DIVISION_LIMIT = 1 << 20  # from here on Miller-Rabin is cheaper than trial division
+
+
+def is_prime_mr(n: int) -> bool:
+    """Deterministic Miller-Rabin test with a small-prime trial division prefilter, for n < MR_EXACT_LIMIT"""
+    if n < 2:
+        return False
+    if n >= MR_EXACT_LIMIT:
+        raise ValueError(f"{n} is too large for a deterministic Miller-Rabin test, the limit is {MR_EXACT_LIMIT}.")
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+
+    # n - 1 = d * 2**s with odd d
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+
+    for a in WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def miller_rabin_cost(n: int) -> int:
+    """Rough amount of modular multiplications of is_prime_mr"""
+    return len(WITNESSES) * max(n.bit_length(), 1)
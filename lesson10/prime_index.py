@@ -0,0 +1,166 @@
+import mmap
+import os
+import struct
+
+from lesson10.primality import is_prime_mr
+from lesson10.prime_sieve import SEGMENT_SIZE, SIEVE_LIMIT, count_primes, count_primes_in_range, is_contiguous, iter_segments
+
+# Constants
+MAGIC = b"PRIMEIDX"
+HEADER = struct.Struct("<8sQ")
+COUNT = struct.Struct("<Q")
+DEFAULT_CHECKPOINT = 1 << 16
+BITS_TO_BYTES = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def pack_bits(mask: bytearray) -> bytes:
+    """Pack a 0/1 mask (length divisible by 8) into a little-endian bitset"""
+    if not mask:
+        return b""
+    return int(mask[::-1].translate(BITS_TO_BYTES), 2).to_bytes(len(mask) // 8, "little")
+
+
+class PrimeIndex:
+    """
+    On-disk index of cumulative prime counts.
+    `<path>.counts` keeps the amount of primes below every multiple of `checkpoint`,
+    `<path>.bits` keeps one bit per integer. Both files are memory-mapped, so
+    several processes can open the same index read-only without copying it.
+    """
+
+    def __init__(self, path: str, checkpoint: int = DEFAULT_CHECKPOINT, readonly: bool = False):
+        if checkpoint <= 0 or checkpoint % 8:
+            raise ValueError("checkpoint should be a positive multiple of 8.")
+        self.counts_path = f"{path}.counts"
+        self.bits_path = f"{path}.bits"
+        self.readonly = readonly
+        self._counts = None
+        self._bits = None
+
+        if not os.path.exists(self.counts_path):
+            if readonly:
+                raise FileNotFoundError(f"Prime index not found: {self.counts_path}")
+            with open(self.counts_path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, checkpoint) + COUNT.pack(0))
+            open(self.bits_path, "wb").close()
+        self.refresh()
+
+    def refresh(self):
+        """(Re)map both files and read the header"""
+        self.close()
+        with open(self.counts_path, "rb") as file:
+            self._counts = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.checkpoint = HEADER.unpack_from(self._counts)
+        if magic != MAGIC:
+            raise ValueError(f"Not a prime index: {self.counts_path}")
+        # The counts file is written last, so it defines the covered bound
+        self.bound = ((len(self._counts) - HEADER.size) // COUNT.size - 1) * self.checkpoint
+        if self.bound:
+            with open(self.bits_path, "rb") as file:
+                self._bits = mmap.mmap(file.fileno(), self.bound // 8, access=mmap.ACCESS_READ)
+
+    def close(self):
+        for mapped in (self._counts, self._bits):
+            if mapped is not None:
+                mapped.close()
+        self._counts = self._bits = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def extend(self, limit: int):
+        """Extend the index so that it covers every integer < limit"""
+        if limit <= self.bound:
+            return
+        if self.readonly:
+            raise PermissionError("Read-only prime index cannot be extended.")
+
+        checkpoint = self.checkpoint
+        new_bound = -(-limit // checkpoint) * checkpoint
+        total = COUNT.unpack_from(self._counts, len(self._counts) - COUNT.size)[0]
+        segment_size = checkpoint * max(1, SEGMENT_SIZE // checkpoint)
+
+        with open(self.bits_path, "ab") as bits_file, open(self.counts_path, "ab") as counts_file:
+            bits_file.truncate(self.bound // 8)
+            for _, mask in iter_segments(self.bound, new_bound, segment_size):
+                bits_file.write(pack_bits(mask))
+                for start in range(0, len(mask), checkpoint):
+                    total += mask.count(1, start, start + checkpoint)
+                    counts_file.write(COUNT.pack(total))
+            bits_file.flush()
+            os.fsync(bits_file.fileno())
+        self.refresh()
+
+    def _count_below(self, x: int) -> int:
+        """Amount of primes < x, x should be within the bound"""
+        block = x // self.checkpoint
+        total = COUNT.unpack_from(self._counts, HEADER.size + block * COUNT.size)[0]
+        low = block * self.checkpoint
+        if x == low:
+            return total
+        chunk = self._bits[low // 8:(x + 7) // 8]
+        leftover = int.from_bytes(chunk, "little") & ((1 << (x - low)) - 1)
+        return total + leftover.bit_count()
+
+    def count_range(self, a: int, b: int) -> int:
+        """Count primes in the closed range [a, b]"""
+        a = max(a, 0)
+        if b < a:
+            return 0
+        if b >= self.bound and not self.readonly:
+            self.extend(b + 1)
+        if b < self.bound:
+            return self._count_below(b + 1) - self._count_below(a)
+        # Read-only index: sieve the part above the bound
+        if a >= self.bound:
+            return count_primes_in_range(a, b + 1)
+        return self._count_below(self.bound) - self._count_below(a) + count_primes_in_range(self.bound, b + 1)
+
+    def is_prime(self, n: int) -> bool:
+        if n < 2:
+            return False
+        if n >= SIEVE_LIMIT and n >= self.bound:
+            return is_prime_mr(n)
+        if n >= self.bound:
+            if self.readonly:
+                return count_primes_in_range(n, n + 1) == 1
+            self.extend(n + 1)
+        return bool(self._bits[n // 8] >> (n % 8) & 1)
+
+    def count_primes(self, numbers) -> int:
+        """Same result as get_primes_amount, answered from the index"""
+        if not numbers:
+            return 0
+        if is_contiguous(numbers):
+            if numbers[-1] >= SIEVE_LIMIT and numbers[-1] >= self.bound:
+                # Too far to index, count_primes routes these numbers itself
+                return count_primes(numbers)
+            return self.count_range(numbers[0], numbers[-1])
+        if not self.readonly:
+            self.extend(index_limit(numbers))
+        return sum(1 for n in numbers if self.is_prime(n))
+
+
+def index_limit(numbers) -> int:
+    """Bound the index should reach for numbers, numbers past SIEVE_LIMIT use Miller-Rabin"""
+    return max((n for n in numbers if n < SIEVE_LIMIT), default=-1) + 1
+
+
+# Indexes opened inside a pool worker, keyed by path
+_worker_indexes = {}
+
+
+def count_primes_with_index(path: str, numbers: list) -> int:
+    """
+    Pool task: count primes using the shared index mapped read-only.
+    The mapping is opened once per worker and refreshed when it falls behind.
+    """
+    index = _worker_indexes.get(path)
+    if index is None:
+        index = _worker_indexes[path] = PrimeIndex(path, readonly=True)
+    if numbers and index_limit(numbers) > index.bound:
+        index.refresh()
+    return index.count_primes(numbers)
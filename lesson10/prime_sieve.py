@@ -0,0 +1,156 @@
+import argparse
+import random
+from math import isqrt
+from operator import eq
+from lesson10.primality import is_prime_mr
+
+# Constants
+SEGMENT_SIZE = 1 << 18
+LOOKUP_LIMIT = 1 << 16  # numbers below are answered from a precomputed table
+SIEVE_LIMIT = 10 ** 7   # numbers from here on go to Miller-Rabin instead of the sieve
+# Sieving this many numbers costs about one Miller-Rabin test (~6 ns vs ~3 us per call)
+SIEVE_NUMBERS_PER_TEST = 400
+
+_lookup_table = None
+
+
+def base_primes(limit: int) -> list[int]:
+    """Return all primes <= limit using a plain sieve of Eratosthenes"""
+    if limit < 2:
+        return []
+    sieve = bytearray(b"\x01") * (limit + 1)
+    sieve[0] = sieve[1] = 0
+    for p in range(2, isqrt(limit) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    return [p for p in range(2, limit + 1) if sieve[p]]
+
+
+def iter_segments(low: int, high: int, segment_size: int = SEGMENT_SIZE):
+    """
+    Sieve the half-open range [low, high) segment by segment.
+    Yields (segment_low, mask) where mask[i] == 1 if segment_low + i is prime.
+    """
+    low = max(low, 0)
+    if high <= low:
+        return
+    primes = base_primes(isqrt(high - 1))
+    for seg_low in range(low, high, segment_size):
+        seg_high = min(seg_low + segment_size, high)
+        mask = bytearray(b"\x01") * (seg_high - seg_low)
+        for p in primes:
+            if p * p >= seg_high:
+                break
+            start = max(p * p, (seg_low + p - 1) // p * p)
+            mask[start - seg_low::p] = bytes(len(range(start - seg_low, seg_high - seg_low, p)))
+        # 0 and 1 are not primes
+        for n in range(seg_low, min(seg_high, 2)):
+            mask[n - seg_low] = 0
+        yield seg_low, mask
+
+
+def count_primes_in_range(low: int, high: int) -> int:
+    """Count primes in the half-open range [low, high)"""
+    return sum(mask.count(1) for _, mask in iter_segments(low, high))
+
+
+def primes_mask(limit: int) -> bytearray:
+    """Return a mask for 0..limit where mask[n] == 1 if n is prime"""
+    mask = bytearray()
+    for _, segment in iter_segments(0, limit + 1):
+        mask += segment
+    return mask
+
+
+def lookup_table() -> bytearray:
+    """Prime mask of 0..LOOKUP_LIMIT - 1, built once per process"""
+    global _lookup_table
+    if _lookup_table is None:
+        _lookup_table = primes_mask(LOOKUP_LIMIT - 1)
+    return _lookup_table
+
+
+def is_prime_batch(numbers: list) -> list[bool]:
+    """
+    Check every number of the list, routed by size and density:
+    small numbers use the lookup table. Numbers below SIEVE_LIMIT share one sieve
+    up to their maximum when there are enough of them to pay for it, that is
+    at least one per SIEVE_NUMBERS_PER_TEST sieved numbers. Everything else is
+    tested with Miller-Rabin.
+    """
+    if not numbers:
+        return []
+    mid = [n for n in numbers if LOOKUP_LIMIT <= n < SIEVE_LIMIT]
+    sieve_max = max(mid, default=None)
+    if sieve_max is not None and len(mid) * SIEVE_NUMBERS_PER_TEST >= sieve_max:
+        mask = primes_mask(sieve_max)
+    else:
+        mask = lookup_table()
+    limit = len(mask)
+    return [n >= 2 and mask[n] == 1 if n < limit else is_prime_mr(n) for n in numbers]
+
+
+def is_contiguous(numbers) -> bool:
+    """True if numbers is an ascending run of consecutive integers, pass a range to skip the scan"""
+    if isinstance(numbers, range):
+        return numbers.step == 1
+    if not numbers:
+        return True
+    first, last, middle = numbers[0], numbers[-1], len(numbers) // 2
+    # Cheap rejections first, most lists that are not a run fail one of them
+    if len(numbers) != last - first + 1 or numbers[middle] != first + middle:
+        return False
+    # The element by element comparison runs in C, without building a second list
+    return all(map(eq, numbers, range(first, last + 1)))
+
+
+def count_primes(numbers) -> int:
+    """
+    Count primes in the list, same result as get_primes_amount.
+    A contiguous range is sieved segment by segment unless its base primes
+    would exceed SIEVE_LIMIT, any other list goes through is_prime_batch.
+    Passing a range instead of a list skips the contiguity check.
+    """
+    if not numbers:
+        return 0
+    if is_contiguous(numbers) and isqrt(max(numbers[-1], 0)) < SIEVE_LIMIT:
+        return count_primes_in_range(numbers[0], numbers[-1] + 1)
+    return sum(is_prime_batch(numbers))
+
+
+def _is_prime_trial_division(n: int) -> bool:
+    if n < 4:
+        return n >= 2
+    return n % 2 == 1 and all(n % d for d in range(3, isqrt(n) + 1, 2))
+
+
+def check_against_trial_division(trials: int = 2000, max_low: int = 1 << 19, seed: int = 0):
+    """
+    Compare the sieve with trial division on short, odd-sized ranges and odd segment sizes,
+    where a base prime without a multiple in the segment must not stop the sieving.
+    """
+    rng = random.Random(seed)
+    # (low, high, segment_size)
+    ranges = [(-3, 0, 7), (-5, 4, 7), (25, 26, 1), (25, 27, 7), (1, 262171, SEGMENT_SIZE),
+              (SEGMENT_SIZE - 3, SEGMENT_SIZE + 5, SEGMENT_SIZE)]
+    for _ in range(trials):
+        low = rng.randrange(max_low)
+        ranges.append((low, low + rng.randrange(1, 202, 2), rng.choice((7, 97, 1001, SEGMENT_SIZE))))
+    for low, high, segment_size in ranges:
+        expected = sum(_is_prime_trial_division(n) for n in range(low, high))
+        segmented = sum(mask.count(1) for _, mask in iter_segments(low, high, segment_size))
+        results = (count_primes(list(range(low, high))), count_primes_in_range(low, high), segmented)
+        if results != (expected,) * 3:
+            raise AssertionError(f"[{low}, {high}) segment {segment_size}: {results} != {expected}")
+    sparse = [rng.randrange(max_low) for _ in range(trials)]
+    if count_primes(sparse) != sum(map(_is_prime_trial_division, sparse)):
+        raise AssertionError("Sparse list count differs from trial division")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the segmented sieve against trial division.")
+    parser.add_argument("--trials", type=int, default=2000, help="Random short ranges to check (default: 2000).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    check_against_trial_division(args.trials, seed=args.seed)
+    print(f"OK: {args.trials} ranges match trial division")
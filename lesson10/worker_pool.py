@@ -0,0 +1,102 @@
+import atexit
+import importlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count, get_context
+
+# Constants
+START_METHODS = ("fork", "forkserver", "spawn")
+# Modules whose task functions run on the shared pool
+DEFAULT_PRELOAD = (
+    "lesson10.prime_sieve",
+    "lesson10.prime_index",
+    "lesson10.lesson10_function",
+    "lesson10.lesson10_function_optimus_prod",
+    "lesson10.lesson10_function_optimus_prod_apply",
+)
+
+_pool = None
+_executor = None
+_settings = {"start_method": None, "processes": None, "preload": DEFAULT_PRELOAD}
+
+
+def configure(start_method: str | None = None, processes: int | None = None, preload=DEFAULT_PRELOAD):
+    """
+    Set up the shared pool before its first use.
+    start_method is one of START_METHODS (None keeps the platform default),
+    preload lists modules every worker imports once at startup.
+    """
+    if _pool is not None or _executor is not None:
+        raise RuntimeError("Worker pool is already running, call shutdown() first.")
+    if start_method is not None and start_method not in START_METHODS:
+        raise ValueError(f"Unknown start method: {start_method}. Choose from {START_METHODS}.")
+    _settings.update(start_method=start_method, processes=processes, preload=tuple(preload))
+
+
+def _preload_modules(modules: tuple):
+    """Pool initializer: import heavy modules once instead of on the first task"""
+    for module in modules:
+        importlib.import_module(module)
+
+
+def get_start_context():
+    """
+    multiprocessing context of the configured start method.
+    Pools and processes started outside the shared pool use it too, so they compare like for like.
+    """
+    return get_context(_settings["start_method"])
+
+
+def get_pool():
+    """Return the shared Pool, starting it on the first call"""
+    global _pool
+    if _pool is None:
+        context = get_start_context()
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(list(_settings["preload"]))
+        processes = _settings["processes"] or cpu_count()
+        _pool = context.Pool(processes, initializer=_preload_modules, initargs=(_settings["preload"],))
+        logging.info(f"Worker pool started: {processes} processes ({context.get_start_method()})")
+    return _pool
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Return the shared ProcessPoolExecutor for loop.run_in_executor, starting it on the first call.
+    It uses the same start method, size and preloaded modules as the Pool.
+    """
+    global _executor
+    if _executor is None:
+        context = get_start_context()
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(list(_settings["preload"]))
+        processes = _settings["processes"] or cpu_count()
+        _executor = ProcessPoolExecutor(processes, mp_context=context,
+                                        initializer=_preload_modules, initargs=(_settings["preload"],))
+        logging.info(f"Worker executor started: {processes} processes ({context.get_start_method()})")
+    return _executor
+
+
+def pool_size() -> int:
+    return _settings["processes"] or cpu_count()
+
+
+def shutdown(wait: bool = True):
+    """Stop the shared pool and executor. wait=False terminates the running tasks"""
+    global _pool, _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=not wait)
+        _executor = None
+        logging.info("Worker executor stopped.")
+    if _pool is None:
+        return
+    if wait:
+        _pool.close()
+    else:
+        _pool.terminate()
+    _pool.join()
+    _pool = None
+    logging.info("Worker pool stopped.")
+
+
+atexit.register(shutdown)
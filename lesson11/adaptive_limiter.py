@@ -0,0 +1,145 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+
+import aiohttp
+
+# Constants
+OVERLOAD_STATUSES = (429, 503)
+LATENCY_SAMPLES = 200
+BASELINE_ALPHA = 0.05
+
+_started_at = ContextVar("limiter_started_at", default=None)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts AIMD style, use it like asyncio.Semaphore: async with limiter.
+    Every successful request adds increase / limit, so the limit grows by about increase per round trip.
+    A timeout, a 429/503 response (raised by raise_for_status) or a latency above
+    latency_tolerance times the baseline multiplies the limit by decrease, at most once per round trip.
+    """
+
+    def __init__(self, initial: int = 10, min_limit: int = 1, max_limit: int = 500, increase: float = 1.0,
+                 decrease: float = 0.5, latency_tolerance: float = 2.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.baseline = None
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.successes = 0
+        self.overloads = 0
+        self.errors = 0
+        self.decreases = 0
+        self.peak_limit = self.limit
+        self._last_decrease = 0.0
+        self._waiters = deque()
+
+    async def __aenter__(self):
+        await self.acquire()
+        _started_at.set(time.monotonic())
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        started_at = _started_at.get()
+        _started_at.set(None)
+        self.release(started_at, exc_value)
+        return False
+
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # It was woken up already, pass the free slot on
+                    self._wake()
+                raise
+        self.in_flight += 1
+
+    def release(self, started_at: float | None = None, error: BaseException | None = None):
+        self.in_flight -= 1
+        if started_at is not None:
+            self._adjust(started_at, error)
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _is_overload(self, error: BaseException | None) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ServerTimeoutError)):
+            return True
+        return isinstance(error, aiohttp.ClientResponseError) and error.status in OVERLOAD_STATUSES
+
+    def _adjust(self, started_at: float, error: BaseException | None):
+        latency = time.monotonic() - started_at
+        if self._is_overload(error):
+            self.overloads += 1
+            self._back_off(started_at)
+        elif isinstance(error, asyncio.CancelledError):
+            return
+        elif error is not None:
+            # Not a capacity signal (404, connection refused ...), leave the limit alone
+            self.errors += 1
+        else:
+            self.successes += 1
+            self.latencies.append(latency)
+            if self.baseline is not None and latency > self.baseline * self.latency_tolerance:
+                self._back_off(started_at)
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                self.peak_limit = max(self.peak_limit, self.limit)
+            # The baseline follows slowly, so a spike does not become the new normal at once
+            self.baseline = latency if self.baseline is None else (
+                (1 - BASELINE_ALPHA) * self.baseline + BASELINE_ALPHA * latency)
+
+    def _back_off(self, started_at: float):
+        # Requests started before the last decrease saw the old limit, do not punish it twice
+        if started_at < self._last_decrease:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(share: float):
+            return latencies[max(0, math.ceil(len(latencies) * share) - 1)] if latencies else None
+
+        return {
+            "limit": int(self.limit),
+            "peak_limit": int(self.peak_limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "errors": self.errors,
+            "decreases": self.decreases,
+            "baseline_s": self.baseline,
+            "p50_s": percentile(0.5),
+            "p95_s": percentile(0.95),
+        }
+
+    def report(self) -> str:
+        stats = self.stats()
+        latency = (f"p50 {stats['p50_s'] * 1000:.1f} ms, p95 {stats['p95_s'] * 1000:.1f} ms"
+                   if stats["p50_s"] is not None else "no samples")
+        return (f"Adaptive limit: {stats['limit']} (peak {stats['peak_limit']}), decreases: {stats['decreases']}, "
+                f"successes: {stats['successes']}, overloads: {stats['overloads']}, errors: {stats['errors']}, "
+                f"latency: {latency}")
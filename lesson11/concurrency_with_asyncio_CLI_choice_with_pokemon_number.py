@@ -4,6 +4,14 @@ import time
 import random
 import requests
 import argparse
+from contextlib import nullcontext
+from itertools import count as attempts
+from lesson11.adaptive_limiter import AdaptiveLimiter
+from lesson11.pokeapi_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL, TTLCache
+from lesson11.pokeapi_store import (
+    CACHE_MODES, DEFAULT_MAX_AGE, DEFAULT_PATH, ResponseStore, StoredResponse, conditional_headers,
+)
+from lesson11.rate_limiter import MAX_RETRIES, RetryPolicy, TokenBucket
 
 
 BASE_URL = "https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
@@ -12,43 +20,141 @@ BASE_URL = "https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
 def get_urls(n: int) -> list[str]:
     return [BASE_URL.format(pokemon_id=random.randint(1, 500)) for _ in range(n)]
 
-def http_request(url: str) -> str:
-    try:
-        print(f"requesting {url} (requests)")
-        response: dict = requests.get(url).json()
-        return response["name"]
-    except requests.RequestException as e:
-        print(f"Error with URL {url}: {e}")
-        return e
+def stored_response(url: str, store: ResponseStore | None, cache_mode: str) -> tuple[StoredResponse | None, bool]:
+    """Look the URL up in the local store, return (entry, serve) like ResponseStore.lookup"""
+    if store is None:
+        return None, False
+    entry, serve = store.lookup(url, cache_mode)
+    if not serve and cache_mode == "cache-only":
+        # Nothing to serve and the network is off limits
+        return StoredResponse(LookupError(f"{url} is not in the local store"), None, None, 0.0), True
+    return entry, serve
 
-def sync_pokemons(count: int):
+
+def failure_details(e: Exception) -> tuple[bool, int | None, str | None]:
+    """(retryable, HTTP status, Retry-After) of a failed requests or aiohttp request"""
+    if isinstance(e, aiohttp.ClientResponseError):
+        return True, e.status, (e.headers or {}).get("Retry-After")
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return True, e.response.status_code, e.response.headers.get("Retry-After")
+    transient = (aiohttp.ClientConnectionError, asyncio.TimeoutError, requests.ConnectionError, requests.Timeout)
+    return isinstance(e, transient), None, None
+
+
+def retry_delay(e: Exception, attempt: int, retry: RetryPolicy | None, bucket: TokenBucket | None) -> float | None:
+    """Seconds to wait before retrying, None to give up and return the exception"""
+    if retry is None:
+        return None
+    retryable, status, retry_after = failure_details(e)
+    if not retryable:
+        return None
+    delay = retry.delay(attempt, status, retry_after)
+    if delay is not None and retry_after is not None and bucket is not None:
+        # The server asked the client to slow down, not just this request
+        bucket.pause(delay)
+    return delay
+
+
+def http_request(url: str, store: ResponseStore | None = None, cache_mode: str = "default",
+                 bucket: TokenBucket | None = None, retry: RetryPolicy | None = None) -> str:
+    entry, serve = stored_response(url, store, cache_mode)
+    if serve:
+        return entry.value
+    if retry is not None:
+        retry.record_request()
+    for attempt in attempts():
+        try:
+            if bucket is not None:
+                bucket.acquire()
+            print(f"requesting {url} (requests)")
+            response = requests.get(url, headers=conditional_headers(entry))
+            if response.status_code == 304 and entry is not None:
+                store.revalidated(url, entry)
+                return entry.value
+            response.raise_for_status()
+            name = response.json()["name"]
+            if store is not None:
+                store.save(url, name, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return name
+        except requests.RequestException as e:
+            delay = retry_delay(e, attempt, retry, bucket)
+            if delay is None:
+                print(f"Error with URL {url}: {e}")
+                return e
+            print(f"Retrying {url} in {delay:.2f} seconds: {e}")
+            time.sleep(delay)
+
+def cached_http_request(url: str, cache: TTLCache | None = None, store: ResponseStore | None = None,
+                        cache_mode: str = "default", bucket: TokenBucket | None = None,
+                        retry: RetryPolicy | None = None) -> str:
+    if cache is None:
+        return http_request(url, store, cache_mode, bucket, retry)
+    return cache.get_or_fetch(url, lambda: http_request(url, store, cache_mode, bucket, retry))
+
+
+def sync_pokemons(count: int, cache: TTLCache | None = None, store: ResponseStore | None = None,
+                  cache_mode: str = "default", bucket: TokenBucket | None = None, retry: RetryPolicy | None = None):
     urls: list[str] = get_urls(n=count)
-    results = [http_request(url) for url in urls]
+    results = [cached_http_request(url, cache, store, cache_mode, bucket, retry) for url in urls]
     return results
 
 
-async def ahttp_request(url: str, session: aiohttp.ClientSession) -> str:
-    try:
-        print(f"requesting {url} (aiohttp)")
-        async with session.get(url) as response:
-            response.raise_for_status()
-            data = await response.json()
-            return data.get("name")
-    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-        print(f"Error with URL {url}: {e}")
-        return e
+async def ahttp_request(url: str, session: aiohttp.ClientSession, store: ResponseStore | None = None,
+                        cache_mode: str = "default", limiter=None, bucket: TokenBucket | None = None,
+                        retry: RetryPolicy | None = None) -> str:
+    """
+    limiter: async context manager held only around the network request, local hits skip it.
+    bucket paces the requests and retry decides on retrying failures, the limiter is not held while they wait.
+    """
+    entry, serve = stored_response(url, store, cache_mode)
+    if serve:
+        return entry.value
+    if retry is not None:
+        retry.record_request()
+    for attempt in attempts():
+        try:
+            if bucket is not None:
+                await bucket.acquire_async()
+            async with limiter or nullcontext():
+                print(f"requesting {url} (aiohttp)")
+                async with session.get(url, headers=conditional_headers(entry)) as response:
+                    if response.status == 304 and entry is not None:
+                        store.revalidated(url, entry)
+                        return entry.value
+                    response.raise_for_status()
+                    data = await response.json()
+            name = data.get("name")
+            if store is not None:
+                store.save(url, name, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return name
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            delay = retry_delay(e, attempt, retry, bucket)
+            if delay is None:
+                print(f"Error with URL {url}: {e}")
+                return e
+            print(f"Retrying {url} in {delay:.2f} seconds: {e}")
+            await asyncio.sleep(delay)
 
 
-async def async_pokemons(count: int, concurrency: int):
+async def async_pokemons(count: int, concurrency: int, cache: TTLCache | None = None,
+                         store: ResponseStore | None = None, cache_mode: str = "default",
+                         limiter: AdaptiveLimiter | None = None, timeout: float | None = None,
+                         bucket: TokenBucket | None = None, retry: RetryPolicy | None = None):
+    """limiter replaces the fixed semaphore of concurrency slots, bucket and retry are shared by all tasks"""
     urls = get_urls(n=count)
-    semaphore = asyncio.Semaphore(concurrency)
+    semaphore = limiter or asyncio.Semaphore(concurrency)
 
     async def limited_ahttp_request(url, session):
-        async with semaphore:
-            return await ahttp_request(url, session)
+        return await ahttp_request(url, session, store, cache_mode, limiter=semaphore, bucket=bucket, retry=retry)
+
+    async def cached_ahttp_request(url, session):
+        # Cache hits and coalesced duplicates do not take a semaphore slot
+        if cache is None:
+            return await limited_ahttp_request(url, session)
+        return await cache.aget_or_fetch(url, lambda: limited_ahttp_request(url, session))
 
-    async with aiohttp.ClientSession() as session:
-        tasks = [limited_ahttp_request(url, session) for url in urls]
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        tasks = [cached_ahttp_request(url, session) for url in urls]
         results = await asyncio.gather(*tasks, return_exceptions=True)
     return results
 
@@ -72,27 +178,113 @@ def main():
         default=10,
         help="Specify the number of concurrent requests for aiohttp (default: 10).",
     )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Adapt the aiohttp concurrency (AIMD), starting from --concurrency.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=200,
+        help="Upper bound of the adaptive concurrency (default: 200).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Total timeout of one aiohttp request in seconds (default: 30).",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Requests per second shared by all requests (default: unlimited).",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=10,
+        help="Requests allowed at once before --rate applies (default: 10).",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=MAX_RETRIES,
+        help=f"Retries of a request failing with 429/503, a timeout or a connection error (default: {MAX_RETRIES}).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help=f"Seconds a fetched Pokémon stays cached (default: {DEFAULT_TTL:g}).",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f"Maximum number of cached responses (default: {DEFAULT_MAX_ENTRIES}).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Fetch every URL, even repeated ones.",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default="default",
+        help="Local store policy: default serves fresh entries and revalidates stale ones, cache-only never "
+             "goes to the network, refresh revalidates everything, bypass ignores the store (default: default).",
+    )
+    parser.add_argument(
+        "--store",
+        default=DEFAULT_PATH,
+        help=f"SQLite file of the local store (default: {DEFAULT_PATH}).",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE,
+        help=f"Seconds a stored response is served without revalidation (default: {DEFAULT_MAX_AGE}).",
+    )
     args = parser.parse_args()
+    cache = None if args.no_cache else TTLCache(ttl=args.cache_ttl, max_entries=args.cache_size)
+    store = None if args.cache_mode == "bypass" else ResponseStore(args.store, max_age=args.max_age)
+    limiter = AdaptiveLimiter(initial=args.concurrency, max_limit=args.max_concurrency) if args.adaptive else None
+    bucket = TokenBucket(args.rate, args.burst) if args.rate else None
+    retry = RetryPolicy(max_retries=args.retries)
 
     print(f"You chose: {args.client}")
     print(f"Pokémon count: {args.count}")
     if args.client == "aiohttp":
-        print(f"Concurrency: {args.concurrency}")
+        print(f"Concurrency: {args.concurrency}{' (adaptive)' if args.adaptive else ''}")
+
+    print(f"Cache mode: {args.cache_mode}")
 
     start = time.perf_counter()
 
-    if args.client == "requests":
-        results = sync_pokemons(count=args.count)
-    elif args.client == "aiohttp":
-        results = asyncio.run(async_pokemons(count=args.count, concurrency=args.concurrency))
-    else:
-        raise ValueError("Invalid client specified")
+    with store or nullcontext():
+        if args.client == "requests":
+            results = sync_pokemons(count=args.count, cache=cache, store=store, cache_mode=args.cache_mode,
+                                    bucket=bucket, retry=retry)
+        elif args.client == "aiohttp":
+            results = asyncio.run(async_pokemons(count=args.count, concurrency=args.concurrency, cache=cache,
+                                                 store=store, cache_mode=args.cache_mode, limiter=limiter,
+                                                 timeout=args.timeout, bucket=bucket, retry=retry))
+        else:
+            raise ValueError("Invalid client specified")
 
     end = time.perf_counter()
 
     print(results)
     print(f"The length of the collection: {len(results)}")
     print(f"Execution time: {end - start:.2f} seconds")
+    if cache is not None:
+        print(cache.report())
+    if limiter is not None:
+        print(limiter.report())
+    print(retry.report())
 
 
 if __name__ == "__main__":
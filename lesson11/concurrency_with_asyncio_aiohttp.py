@@ -1,38 +1,133 @@
 import aiohttp
+import argparse
 import asyncio
 import time
 import random
+from contextlib import asynccontextmanager
+from lesson11.stub_server import start_stub_server
 
 BASE_URL = "https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
 
+# Connector settings
+LIMIT = 100
+LIMIT_PER_HOST = 20
+KEEPALIVE_TIMEOUT = 30
+DNS_CACHE_TTL = 300
 
-async def ahttp_request(url: str) -> str:
+
+class ConnectionStats:
+    """Counts new and reused connections through aiohttp tracing"""
+
+    def __init__(self):
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+        self.dns_lookups = 0
+        self.dns_cache_hits = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.reused += 1
+
+        async def on_dns_resolvehost_end(session, context, params):
+            self.dns_lookups += 1
+
+        async def on_dns_cache_hit(session, context, params):
+            self.dns_cache_hits += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        return trace_config
+
+    def report(self) -> str:
+        reuse = self.reused / self.requests if self.requests else 0.0
+        return (f"requests: {self.requests}, new connections: {self.created}, reused: {self.reused} ({reuse:.0%}), "
+                f"DNS lookups: {self.dns_lookups}, DNS cache hits: {self.dns_cache_hits}")
+
+
+@asynccontextmanager
+async def client_session(stats: ConnectionStats | None = None, limit: int = LIMIT,
+                         limit_per_host: int = LIMIT_PER_HOST, keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+                         ttl_dns_cache: int = DNS_CACHE_TTL):
+    """One pooled session for all requests, the connector and its connections are closed on exit"""
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host,
+                                     keepalive_timeout=keepalive_timeout, ttl_dns_cache=ttl_dns_cache)
+    trace_configs = [stats.trace_config()] if stats is not None else None
+    async with aiohttp.ClientSession(connector=connector, trace_configs=trace_configs) as session:
+        yield session
+
+
+async def ahttp_request(url: str, session: aiohttp.ClientSession) -> str:
     print(f"requesting {url}")
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            data = await response.json()
-            return data["name"]
+    async with session.get(url) as response:
+        data = await response.json()
+        return data["name"]
+
 
+async def ahttp_request_own_session(url: str, stats: ConnectionStats | None = None) -> str:
+    """The old way: a new session, so a new TCP (and TLS) handshake, for every URL"""
+    trace_configs = [stats.trace_config()] if stats is not None else None
+    async with aiohttp.ClientSession(trace_configs=trace_configs) as session:
+        return await ahttp_request(url, session)
 
-def get_urls(n: int) -> list[str]:
-    return [BASE_URL.format(pokemon_id=random.randint(1, 500)) for _ in range(n)]
 
+def get_urls(n: int, base_url: str = BASE_URL) -> list[str]:
+    return [base_url.format(pokemon_id=random.randint(1, 500)) for _ in range(n)]
 
-async def async_pokemons():
-    urls: list[str] = get_urls(n=50)
-    tasks = [ahttp_request(url) for url in urls]
-    results = await asyncio.gather(*tasks)
-    return results
+
+async def async_pokemons(urls: list[str], shared: bool = True, stats: ConnectionStats | None = None):
+    if not shared:
+        return await asyncio.gather(*(ahttp_request_own_session(url, stats) for url in urls))
+    async with client_session(stats) as session:
+        return await asyncio.gather(*(ahttp_request(url, session) for url in urls))
+
+
+async def run(mode: str, count: int, local: bool, delay: float) -> list[tuple[str, float, ConnectionStats, list]]:
+    runner = None
+    base_url = BASE_URL
+    if local:
+        runner, base_url = await start_stub_server(delay=delay)
+    try:
+        urls = get_urls(n=count, base_url=base_url)
+        reports = []
+        for shared in {"shared": (True,), "per-request": (False,), "compare": (False, True)}[mode]:
+            stats = ConnectionStats()
+            start = time.perf_counter()
+            data = await async_pokemons(urls, shared=shared, stats=stats)
+            reports.append(("shared session" if shared else "session per request",
+                            time.perf_counter() - start, stats, data))
+        return reports
+    finally:
+        if runner is not None:
+            await runner.cleanup()
 
 
 def main():
-    start = time.perf_counter()
-    data = asyncio.run(async_pokemons())
-    end = time.perf_counter()
-    print(data)
-    print(f"the len of the collection: {len(data)}")
-    print(f"execution time: {end - start}")
+    parser = argparse.ArgumentParser(description="Fetch Pokémon with one pooled aiohttp session or a session per URL.")
+    parser.add_argument("--mode", choices=("shared", "per-request", "compare"), default="shared")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--local", action="store_true", help="Fetch from a local stub server instead of PokeAPI.")
+    parser.add_argument("--delay", type=float, default=0.0, help="Stub server response delay in seconds.")
+    args = parser.parse_args()
+
+    reports = asyncio.run(run(args.mode, args.count, args.local, args.delay))
+    for name, elapsed, stats, data in reports:
+        print(data)
+        print(f"the len of the collection: {len(data)}")
+        print(f"{name}: execution time: {elapsed}")
+        print(f"{name}: {stats.report()}")
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
\ No newline at end of file
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Constants
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class TTLCache:
+    """
+    Response cache with a time to live and an entry cap, least recently used entries go first.
+    get_or_fetch / aget_or_fetch collapse identical concurrent fetches into one in-flight
+    fetch whose result every waiter shares. Exceptions returned by a fetch are shared but not cached.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._async_in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key):
+        """Return (found, value), the caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key, value):
+        """Cache a fetched value, the caller holds the lock"""
+        if isinstance(value, BaseException):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            found, value = self._lookup(key)
+        return value if found else default
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_fetch(self, key, fetch):
+        """Thread-safe: fetch() runs once per key at a time, other threads wait for its result"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                self._in_flight[key] = Future()
+        if future is not None:
+            return future.result()
+        future = self._in_flight[key]
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, value)
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    async def aget_or_fetch(self, key, fetch):
+        """Async version, fetch is a coroutine function run as one shared task per key"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+        task = self._async_in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._async_in_flight[key] = asyncio.ensure_future(fetch())
+            task.add_done_callback(lambda done: self._finish_async(key, done))
+        # A cancelled waiter must not cancel the fetch the other waiters share
+        return await asyncio.shield(task)
+
+    def _finish_async(self, key, task):
+        self._async_in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+        }
+
+    def report(self) -> str:
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        hit_rate = (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+        return (f"Cache hits: {stats['hits']}, misses: {stats['misses']}, coalesced: {stats['coalesced']}, "
+                f"entries: {stats['entries']}, hit rate: {hit_rate:.0%}")
@@ -0,0 +1,116 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+# Constants
+DEFAULT_PATH = "pokeapi_cache.sqlite3"
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+BATCH_SIZE = 50
+# default: serve fresh entries, revalidate stale ones
+# cache-only: serve whatever is stored, never touch the network
+# refresh: revalidate every stored entry
+# bypass: neither read nor write the store
+CACHE_MODES = ("default", "cache-only", "refresh", "bypass")
+
+
+class StoredResponse(NamedTuple):
+    value: object
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class ResponseStore:
+    """
+    On-disk cache of fetched values with their ETag / Last-Modified validators, kept across runs.
+    SQLite in WAL mode, writes are buffered and inserted in batches of batch_size.
+    Reads see buffered writes. Use it as a context manager, or call close() to flush.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_age: float = DEFAULT_MAX_AGE, batch_size: int = BATCH_SIZE):
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, value TEXT NOT NULL, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, url: str) -> StoredResponse | None:
+        with self._lock:
+            if url in self._pending:
+                return self._pending[url]
+            row = self._connection.execute(
+                "SELECT value, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredResponse(json.loads(row[0]), row[1], row[2], row[3])
+
+    def is_fresh(self, entry: StoredResponse) -> bool:
+        return time.time() - entry.fetched_at < self.max_age
+
+    def lookup(self, url: str, mode: str = "default") -> tuple[StoredResponse | None, bool]:
+        """Return (entry, serve), serve=True means the entry answers without a request"""
+        if mode == "bypass":
+            return None, False
+        entry = self.get(url)
+        if entry is None or mode == "refresh":
+            return entry, False
+        return entry, mode == "cache-only" or self.is_fresh(entry)
+
+    def save(self, url: str, value, etag: str | None = None, last_modified: str | None = None):
+        self._buffer(url, StoredResponse(value, etag, last_modified, time.time()))
+
+    def revalidated(self, url: str, entry: StoredResponse):
+        """The server answered 304 Not Modified: the stored value is fresh again"""
+        self._buffer(url, entry._replace(fetched_at=time.time()))
+
+    def _buffer(self, url: str, entry: StoredResponse):
+        with self._lock:
+            self._pending[url] = entry
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO responses (url, value, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                [(url, json.dumps(entry.value), entry.etag, entry.last_modified, entry.fetched_at)
+                 for url, entry in self._pending.items()],
+            )
+        self._pending.clear()
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def conditional_headers(entry: StoredResponse | None) -> dict:
+    """If-None-Match / If-Modified-Since headers to revalidate a stored entry"""
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
@@ -0,0 +1,131 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Constants
+RETRY_STATUSES = (429, 503)
+MAX_RETRIES = 3
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+BUDGET_RATIO = 0.1
+MIN_BUDGET = 10.0
+
+
+class TokenBucket:
+    """
+    Token bucket shared by threads and asyncio tasks: rate requests per second, bursts of up to burst.
+    Every acquire reserves a token right away and sleeps until it is due, so callers go out in arrival order.
+    pause() stops the refill, e.g. for a Retry-After from the server. Callers already waiting
+    reserve again, so they leave at rate after the pause instead of all at once.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate should be > 0 and burst >= 1.")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        # Tokens accrue from this moment on, it is in the future while paused
+        self._updated = time.monotonic()
+        self._pauses = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _reserve(self) -> tuple[float, int]:
+        """Take a token, possibly borrowing from the future, return the seconds to wait for it and the pause count"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, self._updated - now) + (-self._tokens / self.rate if self._tokens < 0 else 0.0)
+            return wait, self._pauses
+
+    def pause(self, seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now + seconds > self._updated:
+                self._updated = now + seconds
+                # Outstanding reservations are dropped, their owners reserve again
+                self._tokens = 0.0
+                self._pauses += 1
+
+    def acquire(self):
+        while True:
+            wait, pauses = self._reserve()
+            time.sleep(wait)
+            if pauses == self._pauses:
+                return
+
+    async def acquire_async(self):
+        while True:
+            wait, pauses = self._reserve()
+            await asyncio.sleep(wait)
+            if pauses == self._pauses:
+                return
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After is either delay seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to retry a failed request.
+    Retry-After is honoured on 429/503, otherwise the delay is full-jitter exponential backoff.
+    Retries draw from a budget shared by all requests: every request adds budget_ratio,
+    every retry takes one, so a struggling server gets at most about budget_ratio extra load.
+    """
+
+    def __init__(self, max_retries: int = MAX_RETRIES, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                 budget_ratio: float = BUDGET_RATIO, min_budget: float = MIN_BUDGET):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self._budget = min_budget
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def record_request(self):
+        with self._lock:
+            self._budget += self.budget_ratio
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def delay(self, attempt: int, status: int | None = None, retry_after: str | None = None) -> float | None:
+        """
+        Seconds to wait before retry number attempt + 1, None to give up.
+        status=None stands for a connection error or a timeout, both are retried.
+        """
+        if status is not None and status not in RETRY_STATUSES:
+            return None
+        with self._lock:
+            if attempt >= self.max_retries or self._budget < 1:
+                self.exhausted += 1
+                return None
+            self._budget -= 1
+            self.retries += 1
+        server_delay = parse_retry_after(retry_after) if status in RETRY_STATUSES else None
+        return server_delay if server_delay is not None else self.backoff(attempt)
+
+    def report(self) -> str:
+        return f"Retries: {self.retries}, given up: {self.exhausted}, retry budget left: {self._budget:.1f}"
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+from aiohttp import web
+
+# Constants
+HOST = "127.0.0.1"
+POKEMON_PATH = "/api/v2/pokemon/{pokemon_id}"
+
+
+def create_app(delay: float = 0.0, capacity: int | None = None) -> web.Application:
+    """
+    Answers /api/v2/pokemon/<id> like PokeAPI, with just the name, after delay seconds.
+    With capacity set, requests above that many in flight get 429 Too Many Requests and Retry-After: 1.
+    """
+    in_flight = 0
+
+    async def pokemon(request: web.Request) -> web.Response:
+        nonlocal in_flight
+        if capacity is not None and in_flight >= capacity:
+            return web.json_response({"detail": "Too many requests"}, status=429, headers={"Retry-After": "1"})
+        in_flight += 1
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            in_flight -= 1
+        return web.json_response({"name": f"pokemon-{request.match_info['pokemon_id']}"})
+
+    app = web.Application()
+    app.router.add_get(POKEMON_PATH, pokemon)
+    return app
+
+
+async def start_stub_server(port: int = 0, delay: float = 0.0,
+                            capacity: int | None = None) -> tuple[web.AppRunner, str]:
+    """Start the stub in the running loop, return the runner (call cleanup() on it) and the URL template"""
+    runner = web.AppRunner(create_app(delay, capacity))
+    await runner.setup()
+    site = web.TCPSite(runner, HOST, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{HOST}:{port}{POKEMON_PATH}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local PokeAPI stub for benchmarks.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds every response waits (default: 0).")
+    parser.add_argument("--capacity", type=int, default=None, help="Concurrent requests before answering 429.")
+    args = parser.parse_args()
+    web.run_app(create_app(args.delay, args.capacity), host=HOST, port=args.port)
@@ -0,0 +1,84 @@
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+from time import perf_counter
+from lesson7.managing_temporary_14 import GLOBAL_CONFIG, ConfigStore, get_setting, install_store
+
+# Constants
+READS_PER_BATCH = 1000
+
+
+def reader(stop: threading.Event, results: list):
+    """Reads settings in batches, keeping the read count, the slowest batch and the versions seen"""
+    reads, slowest, versions = 0, 0.0, set()
+    while not stop.is_set():
+        start = perf_counter()
+        for _ in range(READS_PER_BATCH):
+            get_setting("max_retries")
+        slowest = max(slowest, perf_counter() - start)
+        reads += READS_PER_BATCH
+        versions.add(get_setting("version"))
+    results.append((reads, slowest, versions))
+
+
+def writer(path: str, stop: threading.Event, interval: float):
+    """Rewrites the config file atomically with a new version every interval seconds"""
+    version = 0
+    while not stop.wait(interval):
+        version += 1
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({**GLOBAL_CONFIG, "max_retries": version % 10, "version": version}, file)
+        os.replace(tmp_path, path)
+
+
+def run(readers: int, duration: float, write_interval: float | None, poll_interval: float) -> dict:
+    with tempfile.TemporaryDirectory(prefix="config_") as directory:
+        path = os.path.join(directory, "config.json")
+        with open(path, "w") as file:
+            json.dump({**GLOBAL_CONFIG, "version": 0}, file)
+
+        with ConfigStore(path, interval=poll_interval) as store:
+            install_store(store)
+            stop, results = threading.Event(), []
+            threads = [threading.Thread(target=reader, args=(stop, results)) for _ in range(readers)]
+            if write_interval is not None:
+                threads.append(threading.Thread(target=writer, args=(path, stop, write_interval)))
+            for thread in threads:
+                thread.start()
+            stop.wait(duration)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            install_store(None)
+
+    reads = sum(result[0] for result in results)
+    return {
+        "reads_per_s": reads / duration,
+        "slowest_batch_ms": max(result[1] for result in results) * 1000,
+        "versions_seen": len(set().union(*(result[2] for result in results))),
+        "last_version": store.snapshot.version,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Config read throughput with and without hot reloads.")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per run.")
+    parser.add_argument("--write-interval", type=float, default=0.01, help="Seconds between file rewrites.")
+    parser.add_argument("--poll-interval", type=float, default=0.01, help="Seconds between watcher checks.")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"{'run':<12}{'reads/s':>14}{f'slowest {READS_PER_BATCH} reads, ms':>28}{'versions seen':>16}{'reloads':>10}")
+    for name, write_interval in (("static", None), ("reloading", args.write_interval)):
+        report = run(args.readers, args.duration, write_interval, args.poll_interval)
+        print(f"{name:<12}{report['reads_per_s']:>14,.0f}{report['slowest_batch_ms']:>28.3f}"
+              f"{report['versions_seen']:>16}{report['last_version']:>10}")
+
+
+if __name__ == "__main__":
+    main()
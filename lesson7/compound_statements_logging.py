@@ -1,6 +1,13 @@
+import gc
 import time
 import logging
 import  math
+import random
+import resource
+import statistics
+import tracemalloc
+from collections import deque
+from collections.abc import Iterator
 
 
 
@@ -9,8 +16,23 @@ class TimerContext:
     Measures the execution time of code inside the with block.
     Uses time.time() to measure time in seconds from the epoch.
     Provides INFO level logs with timestamps, making it suitable for debugging or tracking program execution.
+    With profile_memory=True it also logs the bytes the block allocated, its top allocation
+    lines and peak RSS; the figures stay available in self.memory.
     """
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+    def __init__(self, profile_memory: bool = False, top: int = 5):
+        self.profile_memory = profile_memory
+        self.top = top
+        self.memory = None
+
     def __enter__(self):
+        if self.profile_memory:
+            self.own_tracing = not tracemalloc.is_tracing()
+            if self.own_tracing:
+                tracemalloc.start()
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(self.ignore)
+            self.rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
         self.start_time = time.time()
         logging.info("Start Point")
         return self
@@ -19,6 +41,22 @@ class TimerContext:
         self.end_time = time.time()
         result_time = self.end_time - self.start_time
         logging.info(f"Finish Point. Used time: {result_time:} second")
+        if self.profile_memory:
+            self._log_memory()
+
+    def _log_memory(self):
+        changes = tracemalloc.take_snapshot().filter_traces(self.ignore).compare_to(self.snapshot, "lineno")
+        if self.own_tracing:
+            tracemalloc.stop()
+        self.memory = {
+            "net_bytes": sum(change.size_diff for change in changes),
+            "peak_rss_kib": (self.rss_before, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+            "top": [(str(change.traceback), change.size_diff) for change in changes[:self.top]],
+        }
+        logging.info(f"Net allocated: {self.memory['net_bytes']} bytes. "
+                     f"Peak RSS: {self.memory['peak_rss_kib'][0]} -> {self.memory['peak_rss_kib'][1]} KiB")
+        for site, size in self.memory["top"]:
+            logging.info(f"{site}: {size:+} bytes")
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -34,21 +72,74 @@ with TimerContext():
     result = math.fsum(range(1, 7777))
     logging.info(f"Result: {result}")
 
+with TimerContext(profile_memory=True):
+    result = [str(number) for number in range(1, 7777)]
+
 
-def test_function_in_timer_context(func, *args, **kwargs):
+def run_microbenchmark(func, *args, repeats: int = 5, warmup: int = 1, min_time: float = 0.05,
+                       disable_gc: bool = True, **kwargs) -> dict:
     """
-    Checks the execution of the specified function inside the TimerContext time manager.
+    Measures the specified function with perf_counter_ns.
+    Returned iterators (e.g. generators) are fully consumed, so lazy functions do their work.
+    The loop count doubles until one repeat takes at least min_time seconds.
 
-    :param func: function to be tested
+    :param func: function to be measured
     :param args: positional arguments for the function
+    :param repeats: how many timed repeats to run after calibration
+    :param warmup: untimed calls before calibration
+    :param disable_gc: switch the garbage collector off while timing
     :param kwargs: named arguments for the function
+    :return: summary in nanoseconds per call
     """
-    with TimerContext():
+    def call():
         result = func(*args, **kwargs)
-        logging.info(f"Function `{func.__name__}` executed successfully.")
-    return result
-
-test_function_in_timer_context(math.factorial, 15)
+        if isinstance(result, Iterator):
+            deque(result, maxlen=0)
+
+    def measure(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            call()
+        return time.perf_counter_ns() - start
+
+    for _ in range(warmup):
+        call()
+
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.disable()
+    try:
+        loops = 1
+        while measure(loops) < min_time * 1e9:
+            loops *= 2
+        samples = [measure(loops) / loops for _ in range(repeats)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "name": func.__name__,
+        "loops": loops,
+        "repeats": repeats,
+        "min_ns": min(samples),
+        "median_ns": statistics.median(samples),
+        "mean_ns": statistics.mean(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def print_comparison_table(title: str, results: list[dict]):
+    """Prints the results from fastest to slowest median, relative to the fastest"""
+    results = sorted(results, key=lambda result: result["median_ns"])
+    fastest = results[0]["median_ns"]
+    print(f"\n{title}")
+    print(f"{'function':<24}{'median, us':>12}{'min, us':>12}{'stdev, us':>12}{'loops':>8}{'relative':>10}")
+    for result in results:
+        print(f"{result['name']:<24}{result['median_ns'] / 1000:>12.2f}{result['min_ns'] / 1000:>12.2f}"
+              f"{result['stdev_ns'] / 1000:>12.2f}{result['loops']:>8}{result['median_ns'] / fastest:>9.1f}x")
+
+
+print_comparison_table("factorial", [run_microbenchmark(math.factorial, 15)])
 
 group: list[str] = [
     "John",
@@ -77,7 +168,6 @@ print('\nGenerator')
 for student in deduplicate_generator(group):
     print(f'{20 * '='} \n{student}')
 
-test_function_in_timer_context(deduplicate_generator, group)
 
 
 def deduplicate_set(data: list[str]):
@@ -88,7 +178,6 @@ print('\nSet')
 for student in deduplicate_set(group):
     print(f'{20 * '='} \n{student}')
 
-test_function_in_timer_context(deduplicate_set, group)
 
 def deduplicate_classic(data: list[str]):
     filtered_names = []
@@ -101,4 +190,13 @@ print('\nClassic')
 for student in deduplicate_classic(group):
     print(f'{20 * '='} \n{student}')
 
-test_function_in_timer_context(deduplicate_classic, group)
+# The repeated group above and a larger list with many distinct names
+many_students: list[str] = [f"Student {random.randint(1, 500)}" for _ in range(10000)]
+
+for title, data in (("group (1300 names, 3 distinct)", group), ("many_students (10000 names, ~500 distinct)", many_students)):
+    print_comparison_table(title, [
+        run_microbenchmark(deduplicate_generator, data),
+        run_microbenchmark(deduplicate_set, data),
+        run_microbenchmark(deduplicate_classic, data),
+    ])
+
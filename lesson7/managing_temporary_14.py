@@ -1,5 +1,12 @@
+import json
 import logging
-from copy import deepcopy
+import os
+import threading
+from collections import ChainMap
+from contextvars import ContextVar
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
 
 
 # Configure logging for debugging and tracking operations
@@ -12,89 +19,229 @@ GLOBAL_CONFIG = {
     "max_retries": 3
 }
 
+# Update layers of the active Configuration scopes, innermost first.
+# Every thread and asyncio task sees only the scopes it entered itself.
+_CONFIG_LAYERS: ContextVar[tuple] = ContextVar("config_layers", default=())
+
+
+# Installed ConfigStore, its latest snapshot replaces GLOBAL_CONFIG as the base layer
+_STORE = None
+
+
+def _base_config():
+    store = _STORE
+    return GLOBAL_CONFIG if store is None else store.snapshot.config
+
+
+def current_config() -> ChainMap:
+    """Read-only view of the configuration: updates of the active scopes over the base config."""
+    return ChainMap(*_CONFIG_LAYERS.get(), _base_config())
+
+
+def get_setting(key, default=None):
+    """Fast single-key read without building a view."""
+    for layer in _CONFIG_LAYERS.get():
+        if key in layer:
+            return layer[key]
+    return _base_config().get(key, default)
+
 
 class Configuration:
     def __init__(self, updates, validator=None, raise_exception: bool = True):
 
-        """Context manager for temporarily modifying the global configuration."""
+        """
+        Context manager for temporarily modifying the configuration.
+        The updates are pushed as an overlay layer in a ContextVar, GLOBAL_CONFIG itself is never changed,
+        so entering and exiting costs O(len(updates)) and concurrent scopes do not see each other.
+        """
 
         # Store the updates and the optional validator
-        self.updates = updates
+        self.updates = dict(updates)
         self.validator = validator
         self.raise_exception = raise_exception
 
-        # To store the original state of the global configuration
-        self.original_config = None
+        # Token to pop our layer on exit
+        self._token = None
 
     def __enter__(self):
         """
         Enter the context manager. Apply the configuration updates and validate if required.
         """
-        # TODO: Save a copy of the current GLOBAL_CONFIG so it can be restored later.
-        self.original_config = deepcopy(GLOBAL_CONFIG)
-
-        # TODO: Apply the updates to the GLOBAL_CONFIG.
-        GLOBAL_CONFIG.update(self.updates)
-
-        # TODO: Log the changes for debugging purposes.
+        self._token = _CONFIG_LAYERS.set((self.updates,) + _CONFIG_LAYERS.get())
         logging.info(f"Applied temporary updates enter: {self.updates}")
 
-        # If the validation fails, log the error and restore the original configuration.
+        # If the validation fails, log the error and drop the layer, the block runs with the original configuration.
         if self.validator:
             try:
-                if not self.validator(GLOBAL_CONFIG):
+                if isinstance(self.validator, ConfigSchema):
+                    # The enclosing configuration is already valid, only the touched keys need checking
+                    valid = self.validator.validate_updates(self.updates)
+                else:
+                    valid = self.validator(current_config())
+                if not valid:
                     raise ValueError("Validation Failed enter")
             except Exception as e:
-                # TODO: If an exception occurs within the context block, ensure the original configuration is restored.
-                GLOBAL_CONFIG.update(self.original_config)
-                logging.error(f"Validation failed. Restored original enter:{self.original_config}")
+                _CONFIG_LAYERS.reset(self._token)
+                self._token = None
+                logging.error(f"Validation failed. Restored original enter, dropped updates: {self.updates}")
                 if self.raise_exception:
                     raise e
         else:
-            # TODO: If a validator is provided, check the modified configuration.
-            logging.info(f"Validator is provided successfully enter: {GLOBAL_CONFIG}")
-
+            logging.debug("No validator provided enter, updates applied as is.")
 
         return self
 
-
-
     def __exit__(self, exc_type, exc_value, traceback):
         """
         Exit the context manager. Restore the original configuration.
         """
 
-        GLOBAL_CONFIG.update(self.original_config)
-        logging.info(f"Restored original configuration exit: {self.original_config}")
+        if self._token is not None:
+            _CONFIG_LAYERS.reset(self._token)
+            self._token = None
+        logging.info(f"Restored original configuration exit, dropped updates: {self.updates}")
 
         if exc_type:
             logging.error(f"Exception occurred exit: {exc_value}")
             return not self.raise_exception
         return False
 
+class ConfigSchema:
+    """
+    Validation rules compiled once into per-key checks.
+    Called with a whole config it checks every key, validate_updates checks only the keys
+    of a scope's updates and caches the result per distinct set of updates.
+    """
+
+    def __init__(self, rules, cache_size: int = 1024):
+        """rules: (key, predicate, error message) triples, the predicate returns True for a bad value"""
+        checks = {}
+        for key, predicate, message in rules:
+            checks.setdefault(key, []).append((predicate, message))
+        self._checks = {key: tuple(key_checks) for key, key_checks in checks.items()}
+        self._cached_errors = lru_cache(maxsize=cache_size)(self._errors_of_items)
+
+    def errors(self, config) -> list[str]:
+        return [message
+                for key, key_checks in self._checks.items() if key in config
+                for predicate, message in key_checks if predicate(config[key])]
+
+    def _errors_of_items(self, items: frozenset) -> tuple:
+        return tuple(self.errors(dict(items)))
+
+    def validate_updates(self, updates: dict) -> bool:
+        try:
+            errors = self._cached_errors(frozenset(updates.items()))
+        except TypeError:
+            # Unhashable values can not be cached
+            errors = self.errors(updates)
+        for error in errors:
+            logging.error(error)
+        return not errors
+
+    def __call__(self, config) -> bool:
+        errors = self.errors(config)
+        for error in errors:
+            logging.error(error)
+        return not errors
+
+    def cache_info(self):
+        return self._cached_errors.cache_info()
+
+
+CONFIG_SCHEMA = ConfigSchema([
+    ("feature_a", lambda value: value == "invalid_value", "Invalid value for feature_a."),
+    ("feature_b", lambda value: value == "invalid_value", "Invalid value for feature_b."),
+    ("max_retries", lambda value: value < 0, "max_retries should be >= 0."),
+])
+
+
 # Example validator function (Optional)
 def validate_config(config: dict) -> bool:
     """
     Example validator function to check the validity of the configuration.
     Returns True if the configuration is valid, False otherwise.
+    Pass CONFIG_SCHEMA itself as the validator to check only the updated keys.
     """
+    return CONFIG_SCHEMA(config)
 
-    errors = []
-    # TODO: Implement validation logic, e.g., ensure 'max_retries' is non-negative.
-    if config.get("feature_a") == "invalid_value":
-        errors.append("Invalid value for feature_a.")
 
-    if config.get("feature_b") == "invalid_value":
-        errors.append("Invalid value for feature_b.")
+class ConfigSnapshot(NamedTuple):
+    version: int
+    config: MappingProxyType
 
-    if config.get("max_retries", 0) < 0:
-        errors.append("max_retries should be >= 0.")
 
-    if errors:
-        for error in errors:
-            logging.error(error)
-        return False
-    return True
+class ConfigStore:
+    """
+    Loads the base configuration from a JSON file and hot-reloads it from a watcher thread.
+    Every load publishes a new immutable ConfigSnapshot by rebinding self.snapshot,
+    so readers take it with one attribute read and never wait for a reload.
+    An unreadable or invalid file is logged and the previous snapshot stays in place.
+    """
+
+    def __init__(self, path: str, interval: float = 0.5, validator=validate_config, defaults: dict | None = None):
+        self.path = path
+        self.interval = interval
+        self.validator = validator
+        self.snapshot = ConfigSnapshot(0, MappingProxyType(dict(GLOBAL_CONFIG if defaults is None else defaults)))
+        self._signature = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def reload(self, force: bool = True) -> bool:
+        """Publish the file as a new snapshot, with force=False only if it changed. Returns True if published."""
+        try:
+            signature = self._file_signature()
+            if not force and signature == self._signature:
+                return False
+            with open(self.path) as file:
+                config = json.load(file)
+        except (OSError, ValueError) as e:
+            logging.error(f"Config reload failed, keeping version {self.snapshot.version}: {e}")
+            return False
+        # The file is only marked as seen once it was read, a half-written file is retried on the next tick
+        self._signature = signature
+        if not isinstance(config, dict) or (self.validator and not self.validator(config)):
+            logging.error(f"Invalid config in {self.path}, keeping version {self.snapshot.version}")
+            return False
+        self.snapshot = ConfigSnapshot(self.snapshot.version + 1, MappingProxyType(config))
+        logging.info(f"Config version {self.snapshot.version} loaded from {self.path}")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.reload(force=False)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def install_store(store: ConfigStore | None):
+    """Make the store's snapshots the base configuration, None goes back to GLOBAL_CONFIG"""
+    global _STORE
+    _STORE = store
+
 
 # Example usage (for students to test once implemented)
 if __name__ == "__main__":
@@ -104,21 +251,21 @@ if __name__ == "__main__":
     try:
         # TODO: Use the Configuration context manager to update 'feature_a' and 'max_retries'
         with Configuration({"feature_a": False, "max_retries": 5}):
-            logging.info(f"Inside context:{GLOBAL_CONFIG}")
+            logging.info(f"Inside context:{dict(current_config())}")
     except Exception as e:
         logging.error(f"Error: {e}")
 
-    logging.info(f"After context: {GLOBAL_CONFIG}")
+    logging.info(f"After context: {dict(current_config())}")
 
     # Example 2: Configuration update with validation failure
     try:
         # TODO: Use the Configuration context manager with invalid updates and a validator
         # to see how the context handles validation errors.
         with Configuration({"feature_a": "invalid_value", "max_retries": -1},
-                           validator=validate_config,raise_exception=False):
+                           validator=CONFIG_SCHEMA,raise_exception=False):
             logging.info("This should not be printed if validation fails.But we need this))")
             logging.error(f"Error: Some error")
     except Exception as e:
         logging.error(f"Caught exception: {e}")
 
-    logging.info(f"After failed context: {GLOBAL_CONFIG}")
\ No newline at end of file
+    logging.info(f"After failed context: {dict(current_config())}")
\ No newline at end of file
@@ -0,0 +1,196 @@
+import argparse
+import hashlib
+import heapq
+import logging
+import math
+import os
+import pickle
+import sys
+import tempfile
+from itertools import islice
+from operator import itemgetter
+
+# Constants
+MAX_ITEMS_IN_MEMORY = 1_000_000
+MAX_OPEN_RUNS = 64
+DEFAULT_ERROR_RATE = 0.001
+
+
+def _write_run(records: list, directory: str, number: int) -> str:
+    """Pickle already sorted records one by one into a run file"""
+    path = os.path.join(directory, f"run_{number}.pickle")
+    with open(path, "wb") as file:
+        for record in records:
+            pickle.dump(record, file, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str):
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def _spill_sorted(records, directory: str, prefix: str, max_items: int, key) -> list[str]:
+    """Cut records into runs of max_items, sort every run in place by key and write it to disk"""
+    paths = []
+    while run := list(islice(records, max_items)):
+        run.sort(key=key)
+        paths.append(_write_run(run, directory, f"{prefix}_{len(paths)}"))
+        del run
+    return paths
+
+
+def _spill_first_occurrences(data, directory: str, max_items: int) -> list[str]:
+    """
+    Write one run of (value, first index) sorted by value per chunk of max_items values.
+    Only the dict of the current chunk and then its sorted items are alive.
+    """
+    paths = []
+    indexed = enumerate(data)
+    while True:
+        seen = {}
+        for index, value in islice(indexed, max_items):
+            seen.setdefault(value, index)
+        if not seen:
+            return paths
+        run = sorted(seen.items())
+        del seen
+        paths.append(_write_run(run, directory, f"value_{len(paths)}"))
+        del run
+
+
+def _merge_runs(paths: list[str], directory: str, prefix: str, fan_in: int, key=None):
+    """
+    Merge sorted run files with at most fan_in of them open at once.
+    Groups of fan_in runs are merged into longer runs on disk until one final merge is left.
+    """
+    level = 0
+    while len(paths) > fan_in:
+        merged = []
+        for group_start in range(0, len(paths), fan_in):
+            group = paths[group_start:group_start + fan_in]
+            records = heapq.merge(*(_read_run(path) for path in group), key=key)
+            merged.append(_write_run(records, directory, f"{prefix}_merge{level}_{len(merged)}"))
+            for path in group:
+                os.remove(path)
+        paths = merged
+        level += 1
+    return heapq.merge(*(_read_run(path) for path in paths), key=key)
+
+
+def dedupe_exact(data, max_items_in_memory: int = MAX_ITEMS_IN_MEMORY, tmp_dir: str | None = None,
+                 fan_in: int = MAX_OPEN_RUNS):
+    """
+    External-memory deduplication keeping first-seen order.
+    At most about max_items_in_memory values are held at once: the first pass reads chunks of half
+    of it, because the chunk's dict and its sorted items briefly coexist. The rest is spilled to
+    sorted run files in tmp_dir and merged back with at most fan_in files open.
+    Values must be picklable and orderable.
+    """
+    if max_items_in_memory < 2 or fan_in < 2:
+        raise ValueError("max_items_in_memory and fan_in should be >= 2.")
+    with tempfile.TemporaryDirectory(dir=tmp_dir, prefix="dedup_") as directory:
+        # Pass 1: runs sorted by value, then a merge keeps the smallest index of every value
+        by_value = _spill_first_occurrences(data, directory, max_items_in_memory // 2)
+        merged = _merge_runs(by_value, directory, "value", fan_in)
+
+        def unique():
+            previous = object()
+            for value, index in merged:
+                if value != previous:
+                    previous = value
+                    yield index, value
+
+        # Pass 2: runs of the unique values sorted by first index restore the original order
+        by_index = _spill_sorted(unique(), directory, "index", max_items_in_memory, key=itemgetter(0))
+        for _, value in _merge_runs(by_index, directory, "index", fan_in, key=itemgetter(0)):
+            yield value
+
+
+class BloomFilter:
+    """
+    Bit array sized for capacity items at the given false positive rate.
+    A false positive makes a new item look already seen, it is never the other way round.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE, max_memory_bytes: int | None = None):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity should be > 0 and error_rate between 0 and 1.")
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        memory = (self.size + 7) // 8
+        if max_memory_bytes is not None and memory > max_memory_bytes:
+            raise ValueError(f"Bloom filter needs {memory} bytes, more than max_memory_bytes={max_memory_bytes}.")
+        self.bits = bytearray(memory)
+
+    @staticmethod
+    def _to_bytes(item) -> bytes:
+        if isinstance(item, bytes):
+            return item
+        if isinstance(item, str):
+            return item.encode()
+        return pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+
+    def _positions(self, item):
+        # Double hashing: two 64-bit halves of one digest give every probe position
+        digest = hashlib.blake2b(self._to_bytes(item), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item) -> bool:
+        """Add the item, return True if it was (probably) there already"""
+        present = True
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] >> bit & 1:
+                present = False
+                self.bits[byte] |= 1 << bit
+        return present
+
+    def __contains__(self, item) -> bool:
+        return all(self.bits[position // 8] >> (position % 8) & 1 for position in self._positions(item))
+
+
+def dedupe_approximate(data, capacity: int, error_rate: float = DEFAULT_ERROR_RATE,
+                       max_memory_bytes: int | None = None):
+    """
+    One-pass deduplication in fixed memory keeping first-seen order.
+    Roughly error_rate of the distinct values may be dropped once capacity distinct values are seen.
+    """
+    seen = BloomFilter(capacity, error_rate, max_memory_bytes)
+    for value in data:
+        if not seen.add(value):
+            yield value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate lines of stdin keeping first-seen order.")
+    parser.add_argument("--mode", choices=("exact", "approximate"), default="exact")
+    parser.add_argument("--max-items", type=int, default=MAX_ITEMS_IN_MEMORY, help="Exact mode: items held in memory.")
+    parser.add_argument("--tmp-dir", default=None, help="Exact mode: where run files are spilled.")
+    parser.add_argument("--fan-in", type=int, default=MAX_OPEN_RUNS, help="Exact mode: run files merged at once.")
+    parser.add_argument("--capacity", type=int, default=10_000_000, help="Approximate mode: expected distinct items.")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE)
+    parser.add_argument("--max-memory", type=int, default=None, help="Approximate mode: filter size cap in bytes.")
+    args = parser.parse_args()
+
+    lines = (line.rstrip("\n") for line in sys.stdin)
+    if args.mode == "exact":
+        unique = dedupe_exact(lines, args.max_items, args.tmp_dir, args.fan_in)
+    else:
+        unique = dedupe_approximate(lines, args.capacity, args.error_rate, args.max_memory)
+
+    written = 0
+    for value in unique:
+        sys.stdout.write(value + "\n")
+        written += 1
+    logging.info(f"Unique values: {written}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    main()